@@ -12,7 +12,7 @@ print('The following (supported) packets are present (XTFHeaderType:count): \n\t
 
 # Get multibeam/bathy data (xyza) if present
 if XTFHeaderType.bathy_xyza in p:
-    np_mb = [[y.fDepth for y in x.data] for x in p[XTFHeaderType.bathy_xyza]]
+    np_mb = [x.data.fDepth for x in p[XTFHeaderType.bathy_xyza]]
 
     # Allocate room (with padding in case of varying sizes)
     mb_concat = np.full((len(np_mb), max([len(x) for x in np_mb])), dtype=np.float32, fill_value=np.nan)
@@ -69,11 +69,11 @@ for i in range(10):
     n_samp = 20
     c = (pyxtf.XTFPingChanHeader(), pyxtf.XTFPingChanHeader())
     c[0].ChannelNumber = 0
-    c[0].SlandRange = 30
+    c[0].SlantRange = 30
     c[0].Frequency = 340
     c[0].NumSamples = n_samp
     c[1].ChannelNumber = 1
-    c[1].SlandRange = 30
+    c[1].SlantRange = 30
     c[1].Frequency = 340
     c[1].NumSamples = n_samp
 
@@ -0,0 +1,190 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled versions of the parsing routines in xtf_ctypes.
+The pure python versions are used if this extension has not been built (requires Cython, see setup.py).
+Note: The structures are read using the byte order of the host, which is assumed to be little endian (as XTF).
+"""
+
+from libc.stdint cimport uint8_t, uint16_t, int16_t, uint32_t, int64_t
+from libc.string cimport memcpy
+import numpy as np
+
+
+# Equivalent of XTFPingChanHeader in xtf_ctypes
+cdef packed struct CPingChanHeader:
+    uint16_t ChannelNumber
+    uint16_t DownsampleMethod
+    float SlantRange
+    float GroundRange
+    float TimeDelay
+    float TimeDuration
+    float SecondsPerPing
+    uint16_t ProcessingFlags
+    uint16_t Frequency
+    uint16_t InitialGainCode
+    uint16_t GainCode
+    uint16_t BandWidth
+    uint32_t ContactNumber
+    uint16_t ContactClassification
+    uint8_t ContactSubNumber
+    uint8_t ContactType
+    uint32_t NumSamples
+    uint16_t MillivoltScale
+    float ContactTimeOffTrack
+    uint8_t ContactCloseNumber
+    uint8_t Reserved2
+    float FixedVSOP
+    int16_t Weight
+    uint8_t ReservedSpace[4]
+
+
+def parse_sonar_channels(const unsigned char[::1] packet_bytes, Py_ssize_t n_chans, Py_ssize_t n_bytes_packet,
+                         tuple sonar_bps, tuple sonar_reserved, chan_dtype):
+    """
+    Walks the channel headers and samples following the XTFPingHeader of a sonar ping.
+    See xtf_ctypes._parse_sonar_channels_py for a description of the arguments.
+    :return: Structured array of channel headers, list of (offset, n_bytes) of the samples in each channel
+    """
+    cdef Py_ssize_t chan_size = sizeof(CPingChanHeader)
+    cdef Py_ssize_t n_bytes_read = packet_bytes.shape[0]
+    cdef Py_ssize_t offset = 0
+    cdef Py_ssize_t i, n_samples, n_bytes
+    cdef const CPingChanHeader* p_chan
+
+    if chan_dtype.itemsize != chan_size:
+        raise RuntimeError('The size of XTFPingChanHeader does not match the compiled structure.')
+
+    chan_headers = np.zeros(n_chans, dtype=chan_dtype)
+    cdef unsigned char[::1] chan_bytes = chan_headers.view(np.uint8)
+    sample_slices = []
+
+    for i in range(n_chans):
+        # Copy the XTFPingChanHeader of this channel into the rows of the structured array
+        if offset + chan_size > n_bytes_read:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading XTFPingChanHeader)')
+        p_chan = <const CPingChanHeader*> &packet_bytes[offset]
+        memcpy(&chan_bytes[i * chan_size], p_chan, chan_size)
+        offset += chan_size
+
+        # Tuples are accessed without bounds checking, check against the number of sonar channels explicitly
+        if i >= len(sonar_bps) or i >= len(sonar_reserved):
+            raise IndexError('Ping has more channels than the number of sonar channels in the file header.')
+
+        # Backwards-compatibility: retrive from NumSamples if possible, else use old field
+        n_samples = p_chan.NumSamples if p_chan.NumSamples > 0 else sonar_reserved[i]
+
+        # Calculate number of bytes to read
+        n_bytes = n_samples * <Py_ssize_t> sonar_bps[i]
+        if offset + n_bytes > n_bytes_packet:
+            raise RuntimeError('Number of bytes to read exceeds the number of bytes remaining in packet.')
+        if offset + n_bytes > n_bytes_read:
+            raise RuntimeError('File ended while reading data packets (file corrupt?)')
+
+        sample_slices.append((offset, n_bytes))
+        offset += n_bytes
+
+    return chan_headers, sample_slices
+
+
+def scan_packets(const unsigned char[::1] buf, Py_ssize_t start, const int64_t[::1] n_bytes_field, Py_ssize_t min_size):
+    """
+    Follows the packets in the file from start using NumBytesThisRecord, and checks the magic number of each packet.
+    Equivalent of pyxtf._jit.scan_packets, see XTFPacketStart.scan_packets for a description of the arguments.
+    :return: Tuple of (offsets, header types, NumBytesThisRecord, error offset, error code).
+             The error code is 0 for no error, 1 for a wrong magic number and 2 for NumBytesThisRecord = 0
+    """
+    cdef Py_ssize_t n_bytes_file = buf.shape[0]
+    cdef Py_ssize_t capacity = 1024
+    cdef Py_ssize_t n_packets = 0
+    cdef Py_ssize_t offset = start
+    cdef Py_ssize_t field_offset
+    cdef uint8_t header_type
+    cdef uint32_t n_bytes
+    cdef int error = 0
+
+    offsets_arr = np.empty(capacity, dtype=np.int64)
+    header_types_arr = np.empty(capacity, dtype=np.uint8)
+    sizes_arr = np.empty(capacity, dtype=np.uint32)
+    cdef int64_t[::1] offsets = offsets_arr
+    cdef uint8_t[::1] header_types = header_types_arr
+    cdef uint32_t[::1] sizes = sizes_arr
+
+    while offset + min_size <= n_bytes_file:
+        if buf[offset] != 0xCE or buf[offset + 1] != 0xFA:
+            error = 1
+            break
+
+        header_type = buf[offset + 2]
+        field_offset = offset + n_bytes_field[header_type]
+        n_bytes = 0
+        if field_offset + 4 <= n_bytes_file:
+            memcpy(&n_bytes, &buf[field_offset], 4)
+        if n_bytes == 0:
+            error = 2
+            break
+
+        # Grow the output arrays as needed
+        if n_packets == capacity:
+            capacity *= 2
+            offsets_arr = np.resize(offsets_arr, capacity)
+            header_types_arr = np.resize(header_types_arr, capacity)
+            sizes_arr = np.resize(sizes_arr, capacity)
+            offsets = offsets_arr
+            header_types = header_types_arr
+            sizes = sizes_arr
+
+        offsets[n_packets] = offset
+        header_types[n_packets] = header_type
+        sizes[n_packets] = n_bytes
+        n_packets += 1
+        offset += n_bytes
+
+    return offsets_arr[:n_packets], header_types_arr[:n_packets], sizes_arr[:n_packets], \
+        offset if error else -1, error
+
+
+# Equivalent of XTFHeaderGyro in xtf_ctypes
+cdef packed struct CHeaderGyro:
+    uint16_t MagicNumber
+    uint8_t HeaderType
+    uint8_t Reserved[7]
+    uint32_t NumBytesThisRecord
+    uint16_t Year
+    uint8_t Month
+    uint8_t Day
+    uint8_t Hour
+    uint8_t Minute
+    uint8_t Second
+    uint32_t Microsecond
+    uint32_t SourceEpoch
+    uint32_t TimeTag
+    float Gyro
+    uint8_t TimeFlag
+    uint8_t Reserved1[26]
+
+
+def parse_gyro(const unsigned char[::1] buf, const int64_t[::1] offsets, gyro_dtype):
+    """
+    Copies the XTFHeaderGyro packets at the given offsets into the rows of a structured array.
+    See XTFHeaderGyro.from_offsets for a description of the arguments.
+    :return: Structured array of the gyro packets
+    """
+    cdef Py_ssize_t gyro_size = sizeof(CHeaderGyro)
+    cdef Py_ssize_t n_bytes_file = buf.shape[0]
+    cdef Py_ssize_t i, offset
+
+    if gyro_dtype.itemsize != gyro_size:
+        raise RuntimeError('The size of XTFHeaderGyro does not match the compiled structure.')
+
+    gyros = np.zeros(offsets.shape[0], dtype=gyro_dtype)
+    cdef unsigned char[::1] gyro_bytes = gyros.view(np.uint8)
+
+    for i in range(offsets.shape[0]):
+        offset = offsets[i]
+        if offset < 0 or offset + gyro_size > n_bytes_file:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading XTFHeaderGyro)')
+        if (<const CHeaderGyro*> &buf[offset]).MagicNumber != 0xFACE:
+            raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
+        memcpy(&gyro_bytes[i * gyro_size], &buf[offset], gyro_size)
+
+    return gyros
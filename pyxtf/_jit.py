@@ -0,0 +1,102 @@
+"""
+Optional Numba compiled versions of the scanning and extraction routines in xtf_ctypes.
+Importing this module fails if Numba is not installed, in which case the numpy versions are used.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def scan_packets(buf, start, n_bytes_field, min_size):
+    """
+    Follows the packets in the file from start using NumBytesThisRecord, and checks the magic number of each packet.
+    See XTFPacketStart.scan_packets for a description of the arguments.
+    :return: Tuple of (offsets, header types, NumBytesThisRecord, error offset, error code).
+             The error code is 0 for no error, 1 for a wrong magic number and 2 for NumBytesThisRecord = 0
+    """
+    n_bytes_file = buf.shape[0]
+    capacity = 1024
+    offsets = np.empty(capacity, dtype=np.int64)
+    header_types = np.empty(capacity, dtype=np.uint8)
+    sizes = np.empty(capacity, dtype=np.uint32)
+
+    n_packets = 0
+    offset = start
+    while offset + min_size <= n_bytes_file:
+        if buf[offset] != 0xCE or buf[offset + 1] != 0xFA:
+            return offsets[:n_packets], header_types[:n_packets], sizes[:n_packets], offset, 1
+
+        header_type = buf[offset + 2]
+        field_offset = offset + n_bytes_field[header_type]
+        n_bytes = 0
+        if field_offset + 4 <= n_bytes_file:
+            n_bytes = np.int64(buf[field_offset]) | (np.int64(buf[field_offset + 1]) << 8) | \
+                      (np.int64(buf[field_offset + 2]) << 16) | (np.int64(buf[field_offset + 3]) << 24)
+        if n_bytes == 0:
+            return offsets[:n_packets], header_types[:n_packets], sizes[:n_packets], offset, 2
+
+        # Grow the output arrays as needed
+        if n_packets == capacity:
+            capacity *= 2
+            offsets = np.concatenate((offsets, np.empty(capacity - n_packets, dtype=np.int64)))
+            header_types = np.concatenate((header_types, np.empty(capacity - n_packets, dtype=np.uint8)))
+            sizes = np.concatenate((sizes, np.empty(capacity - n_packets, dtype=np.uint32)))
+
+        offsets[n_packets] = offset
+        header_types[n_packets] = header_type
+        sizes[n_packets] = n_bytes
+        n_packets += 1
+        offset += n_bytes
+
+    return offsets[:n_packets], header_types[:n_packets], sizes[:n_packets], -1, 0
+
+
+@njit(cache=True)
+def _read_uint(buf, pos, n_bytes):
+    """
+    Reads a little endian unsigned integer of n_bytes at pos.
+    """
+    value = np.int64(0)
+    for i in range(n_bytes):
+        value |= np.int64(buf[pos + i]) << (8 * i)
+    return value
+
+
+@njit(cache=True)
+def _days_from_civil(year, month, day):
+    """
+    Number of days since 1970-01-01 of the date (proleptic Gregorian calendar).
+    """
+    year -= month <= 2
+    era = (year if year >= 0 else year - 399) // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+@njit(parallel=True, cache=True)
+def extract_gyro(buf, offsets, field_offsets, out_time, out_gyro):
+    """
+    Reads the time and heading of the XTFHeaderGyro packets at the given offsets, in parallel over the packets.
+    See XTFHeaderGyro.extract for a description of the arguments.
+    :param field_offsets: Offsets of (Year, Month, Day, Hour, Minute, Second, Microsecond, SourceEpoch, Gyro)
+    :param out_time: Output time of each packet, microseconds since 1970-01-01 (int64)
+    :param out_gyro: Output heading of each packet (float32)
+    """
+    for i in prange(offsets.shape[0]):
+        offset = offsets[i]
+        epoch = _read_uint(buf, offset + field_offsets[7], 4)
+        if epoch != 0:
+            out_time[i] = epoch * 1000000
+        else:
+            days = _days_from_civil(_read_uint(buf, offset + field_offsets[0], 2),
+                                    _read_uint(buf, offset + field_offsets[1], 1),
+                                    _read_uint(buf, offset + field_offsets[2], 1))
+            seconds = days * 86400 + _read_uint(buf, offset + field_offsets[3], 1) * 3600 + \
+                _read_uint(buf, offset + field_offsets[4], 1) * 60 + _read_uint(buf, offset + field_offsets[5], 1)
+            out_time[i] = seconds * 1000000 + _read_uint(buf, offset + field_offsets[6], 4)
+
+        gyro_pos = offset + field_offsets[8]
+        out_gyro[i] = buf[gyro_pos:gyro_pos + 4].view(np.float32)[0]
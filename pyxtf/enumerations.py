@@ -35,14 +35,14 @@ class AutoIntEnum(IntEnum):
 
 
 @unique
-class XTFChannelType(AutoIntEnum):
+class XTFChannelType(IntEnum):
     """
     TypeOfChannel enumeration in XTFChanInfo
     """
-    subbottom = ()
-    port = ()
-    stbd = ()
-    bathy = ()
+    subbottom = 0
+    port = 1
+    stbd = 2
+    bathy = 3
 
 @unique
 class XTFNavUnits(IntEnum):
@@ -141,98 +141,98 @@ class XTFProcessingFlags(IntEnum):
     filter = 16
 
 
-class XTFManufacturerID(AutoIntEnum):
+class XTFManufacturerID(IntEnum):
     """
     ManufacturerID enumeration in XTFRawCustomHeader
     """
-    unknown = ()
-    benthos = ()
-    reson = ()
-    edgetech = ()
-    klein = ()
-    coda = ()
-    kongsberg = ()
-    cmax = ()
-    marine_sonics = ()
-    applied_signal = ()
-    imagenex = ()
-    geoacoustics = ()
+    unknown = 0
+    benthos = 1
+    reson = 2
+    edgetech = 3
+    klein = 4
+    coda = 5
+    kongsberg = 6
+    cmax = 7
+    marine_sonics = 8
+    applied_signal = 9
+    imagenex = 10
+    geoacoustics = 11
 
 
-class XTFSonarType(AutoIntEnum):
+class XTFSonarType(IntEnum):
     """
     SonarType enumeration in XTFFileHeader
     """
-    none = ()
-    jamstec = ()
-    analog_c31 = ()
-    sis1000 = ()
-    analog_32chan = ()
-    klein2000 = ()
-    rws = ()
-    df1000 = ()
-    seabat = ()
-    klein595 = ()
-    egg260 = ()
-    sonatech_dds = ()
-    echoscan = ()
-    elac = ()
-    klein5000 = ()
-    reson_seabat_8101 = ()
-    imagenex_858 = ()
-    usn_silos = ()
-    sonatech = ()
-    delph_au32 = ()
-    generic_sonar = ()
-    simrad_sm2000 = ()
-    standard_multimedia_audio = ()
-    edgetech_aci_card = ()
-    edgetech_black_box = ()
-    fugro_deeptow = ()
-    cc_edgetech_chirp_conversion = ()
-    dti_sas = ()
-    fugro_osiris_ss = ()
-    fugro_osiris_mb = ()
-    geoacoustics_sls = ()
-    simrad_em2000_em3000 = ()
-    klein_system_3000 = ()
-    shrsss_chirp_system = ()
-    benthos_c3d_sara_caati = ()
-    edgetech_mpx = ()
-    cmax = ()
-    benthos_sis1624 = ()
-    edgetech_4200 = ()
-    benthos_sis1500 = ()
-    benthos_sis1502 = ()
-    benthos_sis3000 = ()
-    benthos_sis7000 = ()
-    df1000_dcu = ()
-    none_sidescan = ()
-    none_multibeam = ()
-    reson_7125 = ()
-    coda_echoscope = ()
-    kongsberg_sas = ()
-    qinsy = ()
-    geoacoustics_dsss = ()
-    cmax_usb = ()
-    swathplus_bathy = ()
-    r2sonic_qinsy = ()
-    r2sonic_triton = ()
-    swathplus_converted_bathy = ()
-    edgetech_4600 = ()
-    klein_3500 = ()
-    klein_5900 = ()
-    em2040 = ()
-    klein5kv2 = ()
-    dt100 = ()
-    kraken62 = ()
-    unknown1 = ()
-    unknown2 = ()
-    kraken65 = ()
-    klein_4900 = ()
-    fsi_hms622 = ()
-    fsi_hms6x4 = ()
-    fsi_hms6x5 = ()
+    none = 0
+    jamstec = 1
+    analog_c31 = 2
+    sis1000 = 3
+    analog_32chan = 4
+    klein2000 = 5
+    rws = 6
+    df1000 = 7
+    seabat = 8
+    klein595 = 9
+    egg260 = 10
+    sonatech_dds = 11
+    echoscan = 12
+    elac = 13
+    klein5000 = 14
+    reson_seabat_8101 = 15
+    imagenex_858 = 16
+    usn_silos = 17
+    sonatech = 18
+    delph_au32 = 19
+    generic_sonar = 20
+    simrad_sm2000 = 21
+    standard_multimedia_audio = 22
+    edgetech_aci_card = 23
+    edgetech_black_box = 24
+    fugro_deeptow = 25
+    cc_edgetech_chirp_conversion = 26
+    dti_sas = 27
+    fugro_osiris_ss = 28
+    fugro_osiris_mb = 29
+    geoacoustics_sls = 30
+    simrad_em2000_em3000 = 31
+    klein_system_3000 = 32
+    shrsss_chirp_system = 33
+    benthos_c3d_sara_caati = 34
+    edgetech_mpx = 35
+    cmax = 36
+    benthos_sis1624 = 37
+    edgetech_4200 = 38
+    benthos_sis1500 = 39
+    benthos_sis1502 = 40
+    benthos_sis3000 = 41
+    benthos_sis7000 = 42
+    df1000_dcu = 43
+    none_sidescan = 44
+    none_multibeam = 45
+    reson_7125 = 46
+    coda_echoscope = 47
+    kongsberg_sas = 48
+    qinsy = 49
+    geoacoustics_dsss = 50
+    cmax_usb = 51
+    swathplus_bathy = 52
+    r2sonic_qinsy = 53
+    r2sonic_triton = 54
+    swathplus_converted_bathy = 55
+    edgetech_4600 = 56
+    klein_3500 = 57
+    klein_5900 = 58
+    em2040 = 59
+    klein5kv2 = 60
+    dt100 = 61
+    kraken62 = 62
+    unknown1 = 63
+    unknown2 = 64
+    kraken65 = 65
+    klein_4900 = 66
+    fsi_hms622 = 67
+    fsi_hms6x4 = 68
+    fsi_hms6x5 = 69
     deepvision_osm2 = 250
 
 
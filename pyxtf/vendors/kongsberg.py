@@ -178,19 +178,47 @@ class KMRawRangeAngle78(KMBase):
         ('Checksum', ctypes.c_uint16)  # Checksum of data between STX and ETX
     ]
 
+    # Classes with the TX and RX arrays sized for each (Ntx, Nrx), see _sized_class
+    _sized_classes = {}
+
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header=None):
         if type(buffer) in [bytes, bytearray]:
             buffer = BytesIO(buffer)
 
             # Read bytes up until the variable-sized data
-        base_bytes = buffer.read(cls.TX.offset)
-        n_bytes = ctypes.c_uint32.from_buffer_copy(base_bytes, cls.NumberOfBytes.offset).value
-        n_tx = ctypes.c_uint16.from_buffer_copy(base_bytes, cls.Ntx.offset).value
-        n_rx = ctypes.c_uint16.from_buffer_copy(base_bytes, cls.Nrx.offset).value
+        field_offsets = cls._FIELD_OFFSETS
+        base_bytes = buffer.read(field_offsets['TX'])
+        n_bytes = ctypes.c_uint32.from_buffer_copy(base_bytes, field_offsets['NumberOfBytes']).value
+        n_tx = ctypes.c_uint16.from_buffer_copy(base_bytes, field_offsets['Ntx']).value
+        n_rx = ctypes.c_uint16.from_buffer_copy(base_bytes, field_offsets['Nrx']).value
 
         # Read remaining bytes
-        remaining_bytes = buffer.read(n_bytes - cls.TX.offset + cls.NumberOfBytes.size)
+        remaining_bytes = buffer.read(n_bytes - field_offsets['TX'] + cls.NumberOfBytes.size)
+
+        new_cls = cls._sized_class(n_tx, n_rx)
+
+        all_bytes = base_bytes + remaining_bytes
+        obj = new_cls.from_buffer_copy(all_bytes)
+
+        # Checksum (not crc16, but a straight sum of bytes with overflow)
+        chk = (sum(all_bytes[new_cls._FIELD_OFFSETS['DatagramType']:new_cls._FIELD_OFFSETS['EndID']]) & 0xFFFF)
+        if chk != obj.Checksum:
+            warning_str = '{}: Checksum failed'.format(cls.__name__)
+            warnings.warn(warning_str)
+
+        return obj
+
+    @classmethod
+    def _sized_class(cls, n_tx: int, n_rx: int):
+        """
+        Returns the class with the TX and RX arrays at the given size.
+        The classes are created dynamically once per size and cached, as creating a structure class is expensive.
+        """
+        try:
+            return cls._sized_classes[n_tx, n_rx]
+        except KeyError:
+            pass
 
         # Create new class dynamically with string array at the correct size
         new_name = cls.__name__ + '_ntx{}_nrx{}'.format(n_tx, n_rx)
@@ -199,22 +227,13 @@ class KMRawRangeAngle78(KMBase):
         rx_idx = [i for i, (name, fieldtype) in enumerate(cls._fields_) if name == 'RX'][0]
         new_fields[tx_idx] = ('TX', KMRawRangeAngle78_TX * n_tx)
         new_fields[rx_idx] = ('RX', KMRawRangeAngle78_RX * n_rx)
-        new_cls = type(new_name, (ctypes.LittleEndianStructure,), {
-            '__str__': cls.__str__,
+        new_cls = type(new_name, (XTFBase,), {
             '_pack_': cls._pack_,
             '_fields_': new_fields
         })
+        cls._sized_classes[n_tx, n_rx] = new_cls
 
-        all_bytes = base_bytes + remaining_bytes
-        obj = new_cls.from_buffer_copy(all_bytes)
-
-        # Checksum (not crc16, but a straight sum of bytes with overflow)
-        chk = (sum(all_bytes[new_cls.DatagramType.offset:new_cls.EndID.offset]) & 0xFFFF)
-        if chk != obj.Checksum:
-            warning_str = '{}: Checksum failed'.format(cls.__name__)
-            warnings.warn(warning_str)
-
-        return obj
+        return new_cls
 
     def __init__(self):
         super().__init__()
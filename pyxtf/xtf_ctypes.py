@@ -1,7 +1,9 @@
 import ctypes
-from datetime import date
+import struct
+import threading
 from io import IOBase, BytesIO
-from typing import List
+from types import MappingProxyType
+from typing import List, Tuple
 import numpy as np
 from warnings import warn
 
@@ -57,11 +59,197 @@ sample_format_dtype = {
 }
 
 
-class XTFBase(ctypes.LittleEndianStructure):
+# Cumulative number of days in the year before the first day of each month (non-leap year)
+_MDAYS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+# Number of days in each month (non-leap year)
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _ctype_to_dtype(ctype) -> np.dtype:
+    """
+    Translates a ctypes type (as used in _fields_) to the equivalent little endian numpy dtype.
+    Arrays become subarrays, char arrays become bytes and nested structures use their _np_dtype.
+    """
+    if issubclass(ctype, ctypes.Array):
+        if ctype._type_ is ctypes.c_char:
+            return np.dtype('S{}'.format(ctype._length_))
+        return np.dtype((_ctype_to_dtype(ctype._type_), (ctype._length_,)))
+    if issubclass(ctype, ctypes.Structure):
+        return ctype._np_dtype
+    return np.dtype(ctype).newbyteorder('<')
+
+
+# struct format character of the numeric field types, by numpy (kind, itemsize)
+_STRUCT_CODES = {
+    ('b', 1): '?',
+    ('i', 1): 'b', ('u', 1): 'B',
+    ('i', 2): 'h', ('u', 2): 'H',
+    ('i', 4): 'i', ('u', 4): 'I',
+    ('i', 8): 'q', ('u', 8): 'Q',
+    ('f', 4): 'f', ('f', 8): 'd'
+}
+
+
+def _ctype_to_struct_format(ctype) -> str:
+    """
+    Translates a ctypes type (as used in _fields_) to the equivalent struct format (standard sizes, no alignment).
+    Numeric fields are unpacked as numbers, arrays and nested structures as bytes.
+    """
+    dtype = _ctype_to_dtype(ctype)
+    if dtype.shape or dtype.fields:
+        return '{}s'.format(dtype.itemsize)
+
+    return _STRUCT_CODES.get((dtype.kind, dtype.itemsize), '{}s'.format(dtype.itemsize))
+
+
+class _XTFStructType(type(ctypes.LittleEndianStructure)):
+    """
+    Metaclass for the XTF structures.
+    Caches layout information on the class once ctypes has resolved the _fields_ of the structure.
+    """
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+
+        # Size of the structure in bytes, avoids calling ctypes.sizeof for every packet read
+        cls._SIZE = ctypes.sizeof(cls)
+
+        # Check the layout against the size given in the XTF format document (if declared by the class itself)
+        expected_size = namespace.get('_EXPECTED_SIZE')
+        if expected_size is not None and cls._SIZE != expected_size:
+            raise RuntimeError('{} expected size is {} bytes, was {} bytes'.format(name, expected_size, cls._SIZE))
+
+        # Name and offset of all ctypes fields (including those of the base classes) in structure order
+        cls._all_fields = tuple(
+            (field_name, getattr(cls, field_name).offset)
+            for base in reversed(cls.__mro__)
+            for field_name, *_ in base.__dict__.get('_fields_', ())
+        )
+
+        # Numpy equivalent of the structure (packed, little endian), the offsets and size are taken from ctypes
+        # Used to parse many structures at once without creating an object per structure (see from_buffer_bulk)
+        field_types = [
+            (field_name, field_type)
+            for base in reversed(cls.__mro__)
+            for field_name, field_type, *_ in base.__dict__.get('_fields_', ())
+        ]
+        cls._np_dtype = np.dtype({
+            'names': [field_name for field_name, _ in field_types],
+            'formats': [_ctype_to_dtype(field_type) for _, field_type in field_types],
+            'offsets': [offset for _, offset in cls._all_fields],
+            'itemsize': cls._SIZE
+        })
+
+        # The same dtype with np.record as the element type, arrays of it are viewed as np.recarray without numpy
+        # having to convert the dtype for every view (which is slower than creating the array itself)
+        cls._np_record_dtype = np.dtype((np.record, cls._np_dtype))
+
+        cls._FIELD_OFFSETS = dict(cls._all_fields)
+
+        # struct equivalent of the structure, unpacks all the fields with a single call (see unpack_tuple)
+        # Gaps between the fields (if any) are skipped with pad bytes
+        struct_format = ['<']
+        pos = 0
+        for (_, field_type), (_, offset) in zip(field_types, cls._all_fields):
+            if offset > pos:
+                struct_format.append('{}x'.format(offset - pos))
+            struct_format.append(_ctype_to_struct_format(field_type))
+            pos = offset + ctypes.sizeof(field_type)
+        if cls._SIZE > pos:
+            struct_format.append('{}x'.format(cls._SIZE - pos))
+        cls._struct = struct.Struct(''.join(struct_format))
+        cls._FIELD_INDEX = {field_name: i for i, (field_name, _) in enumerate(cls._all_fields)}
+
+        # Presence of the optional time fields, used by XTFPacket.get_time to avoid probing with hasattr
+        field_names = cls._FIELD_OFFSETS.keys()
+        cls._has_SourceEpoch = 'SourceEpoch' in field_names
+        cls._has_EpochMicroseconds = 'EpochMicroseconds' in field_names
+        cls._has_HSeconds = 'HSeconds' in field_names
+        cls._has_Millisecond = 'Millisecond' in field_names
+        cls._has_Microsecond = 'Microsecond' in field_names
+
+        # Fields needed to calculate the time of a packet (see XTFPacket.get_times_bulk)
+        cls._time_fields = tuple(field_name for field_name in (
+            'Year', 'Month', 'Day', 'Hour', 'Minute', 'Second',
+            'HSeconds', 'Millisecond', 'Microsecond', 'SourceEpoch', 'EpochMicroseconds'
+        ) if field_name in field_names)
+
+        # Public properties and slots, these are printed along with the fields
+        cls._properties = tuple(sorted({
+            name for base in cls.__mro__ for name, value in vars(base).items()
+            if isinstance(value, property) and not name.startswith('_')
+        }))
+        cls._slot_names = tuple(sorted({
+            name for base in cls.__mro__ for name in base.__dict__.get('__slots__', ())
+            if not name.startswith('_')
+        }))
+
+        # All the slots (including the private ones), pickled along with the structure memory (see XTFBase.__reduce__)
+        cls._all_slots = tuple(
+            name for base in reversed(cls.__mro__) for name in base.__dict__.get('__slots__', ())
+            if name not in ('__dict__', '__weakref__')
+        )
+
+
+class _XTFBufferView:
+    """
+    Minimal file-like reader over an object supporting the buffer protocol (e.g. mmap.mmap).
+    Reads return memoryview slices of the underlying buffer instead of copies, which
+    XTFBase.create_from_buffer uses to construct the structures as views (see XTFBase.from_mmap).
+    """
+    __slots__ = ('view', 'pos')
+
+    def __init__(self, buffer, offset: int = 0):
+        self.view = memoryview(buffer).cast('B')
+        self.pos = offset
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self.pos
+        elif whence == 2:
+            offset += len(self.view)
+        self.pos = offset
+        return self.pos
+
+    def read(self, n_bytes: int = -1) -> memoryview:
+        start = min(self.pos, len(self.view))
+        end = len(self.view) if n_bytes is None or n_bytes < 0 else min(start + n_bytes, len(self.view))
+        self.pos = end
+        return self.view[start:end]
+
+
+# Scratch instances of the XTF structures (see XTFBase.get_scratch), separate for each thread
+_SCRATCH = threading.local()
+
+
+def _unpickle_struct(cls, data: bytes, state: dict):
+    """
+    Reconstructs a pickled (or copied) XTF structure, see XTFBase.__reduce__.
+    :param cls: The structure class
+    :param data: The bytes of the structure
+    :param state: The values of the slots and the instance dictionary
+    :return: The structure
+    """
+    obj = cls.from_buffer_copy(data)
+    for name, value in state.items():
+        setattr(obj, name, value)
+
+    return obj
+
+
+class XTFBase(ctypes.LittleEndianStructure, metaclass=_XTFStructType):
     """
     Base class for all XTF ctypes.Structure children.
     Exposes basic utility like printing of fields and constructing class from a buffer.
     """
+    __slots__ = ()
 
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header=None):
@@ -75,58 +263,203 @@ class XTFBase(ctypes.LittleEndianStructure):
         if type(buffer) in [bytes, bytearray]:
             buffer = BytesIO(buffer)
 
-        header_bytes = buffer.read(ctypes.sizeof(cls))
+        # Copy straight out of the memory of BytesIO objects, avoids creating an intermediate bytes object
+        if isinstance(buffer, BytesIO):
+            n_bytes = cls._SIZE
+            pos = buffer.tell()
+            with buffer.getbuffer() as buffer_view:
+                if pos + n_bytes > len(buffer_view):
+                    raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+                obj = cls.from_buffer_copy(buffer_view, pos)
+            buffer.seek(pos + n_bytes)
+
+            return obj
+
+        # Map the structure directly onto the memory of the buffer (copy only if it is read-only)
+        if isinstance(buffer, _XTFBufferView):
+            n_bytes = cls._SIZE
+            pos = buffer.tell()
+            if pos + n_bytes > len(buffer.view):
+                raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+            if buffer.view.readonly:
+                obj = cls.from_buffer_copy(buffer.view, pos)
+            else:
+                obj = cls.from_buffer(buffer.view, pos)
+            buffer.seek(pos + n_bytes)
+
+            return obj
+
+        # Read directly into the memory of a new (zero-filled) structure, avoids creating an intermediate bytes object
+        if hasattr(buffer, 'readinto'):
+            obj = cls.__new__(cls)
+            if buffer.readinto(obj) < cls._SIZE:
+                raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+
+            return obj
+
+        header_bytes = buffer.read(cls._SIZE)
         if not header_bytes:
             raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
 
         return cls.from_buffer_copy(header_bytes)
 
+    @classmethod
+    def from_buffer_bulk(cls, buffer, count: int = -1, offset: int = 0) -> np.recarray:
+        """
+        Interprets consecutive structures in the buffer as a structured numpy array (one row per structure).
+        No objects are created per structure and the array is a view of the buffer (not a copy).
+        :param buffer: Input bytes, or any object supporting the buffer protocol (e.g. mmap)
+        :param count: Number of structures, -1 uses all complete structures in the buffer
+        :param offset: Offset of the first structure in the buffer
+        :return: numpy.recarray with the fields as columns (e.g. records.fDepth)
+        """
+        if count < 0:
+            count = (memoryview(buffer).nbytes - offset) // cls._SIZE
+
+        return np.frombuffer(buffer, dtype=cls._np_record_dtype, count=count, offset=offset).view(np.recarray)
+
+    @classmethod
+    def from_offsets(cls, buffer, offsets) -> np.recarray:
+        """
+        Gathers the structures at the given offsets of the buffer into a structured numpy array (one row per structure).
+        Unlike from_buffer_bulk the structures do not have to be consecutive, e.g. the offsets from
+        XTFPacketStart.scan_packets of one header type. The rows are copied with a single numpy indexing operation.
+        :param buffer: Input bytes, or any object supporting the buffer protocol (e.g. mmap)
+        :param offsets: Offset of each structure in the buffer
+        :return: numpy.recarray with the fields as columns
+        """
+        buf = np.frombuffer(buffer, dtype=np.uint8)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if not offsets.size:
+            return np.empty(0, dtype=cls._np_record_dtype).view(np.recarray)
+        if offsets.min() < 0 or offsets.max() + cls._SIZE > buf.shape[0]:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+
+        # Index a (zero-copy) view of every structure-sized window of the buffer, only the output is allocated
+        windows = np.lib.stride_tricks.sliding_window_view(buf, cls._SIZE)
+        records = windows[offsets]
+        return records.view(cls._np_record_dtype).reshape(-1).view(np.recarray)
+
+    @classmethod
+    def unpack_tuple(cls, buffer, offset: int = 0) -> tuple:
+        """
+        Unpacks all the fields of the structure in the buffer to a tuple with a single struct call.
+        Faster than constructing the structure when only a few fields are needed, index the tuple with
+        cls._FIELD_INDEX (e.g. values[XTFHeaderNavigation._FIELD_INDEX['RawYcoordinate']]).
+        Note: Array and nested structure fields are returned as bytes.
+        :param buffer: Input bytes (or any object supporting the buffer protocol)
+        :param offset: Offset of the structure in the buffer
+        :return: Tuple of the field values in structure order
+        """
+        return cls._struct.unpack_from(buffer, offset)
+
     @classmethod
     def view_from_buffer(cls, buffer: IOBase, file_header=None):
         """
-        Returns a view of the XTF structure in the buffer without copying.
-        :param buffer: Input bytes
+        Returns a view of the XTF structure in the buffer without copying (see from_mmap).
+        :param buffer: Object supporting the buffer protocol (e.g. mmap or bytearray), the structure starts at offset 0
         :param file_header: XTFFileHeader, only necessary for XTFPingHeader
         :return:
         """
-        raise NotImplementedError("Views has not been implemented")
+        if not isinstance(buffer, _XTFBufferView):
+            if isinstance(buffer, IOBase):
+                raise RuntimeError('Views require an object supporting the buffer protocol (e.g. mmap), not a stream.')
+            buffer = _XTFBufferView(buffer)
 
-    def __str__(self):
+        return cls.create_from_buffer(buffer, file_header)
+
+    @classmethod
+    def from_mmap(cls, mm, offset: int = 0, file_header=None):
         """
-        Prints the fields in the class (with ctype-fields) in the order in which they appear in the structure.
+        Constructs the XTF structure as a view of a memory-mapped file at the given offset.
+        The fields are read from (and written to) the mapped memory directly, and the payload of the packets
+        (sonar samples, bathymetry, raw data) are numpy arrays or memoryviews of the mapped memory, not copies.
+        Note: The header fields and bathymetry beams can only be mapped if the mmap is writable (e.g. opened with
+              mmap.ACCESS_COPY), otherwise they are copied. The mmap cannot be closed while any views of it are alive.
+        :param mm: mmap.mmap (or other object supporting the buffer protocol) of the XTF file
+        :param offset: Byte offset of the structure in the file, e.g. from XTFPacketStart.scan_offsets
+        :param file_header: XTFFileHeader, only necessary for XTFPingHeader
+        :return:
+        """
+        return cls.view_from_buffer(_XTFBufferView(mm, offset), file_header)
+
+    @classmethod
+    def get_scratch(cls):
+        """
+        Returns a reusable instance of the structure, for reading values that are only needed transiently
+        (e.g. with readinto or ctypes.memmove) without allocating a new instance for every packet.
+        Note: The instance is shared by all callers in the thread, copy out the values before handing over control.
+        :return: The scratch instance of this class (subclasses have their own instance)
+        """
+        try:
+            instances = _SCRATCH.instances
+        except AttributeError:
+            instances = _SCRATCH.instances = {}
+
+        obj = instances.get(cls)
+        if obj is None:
+            obj = instances[cls] = cls()
+
+        return obj
+
+    def asarray(self, field_name: str) -> np.ndarray:
+        """
+        Returns the array field as a numpy array, which is a view of the structure memory (no copy).
+        This is much faster than converting the ctypes array element by element, e.g. with list(obj.Reserved).
+        :param field_name: Name of a ctypes array field of the structure
+        :return: Numpy array view of the field, writes to the array are written to the structure
+        """
+        field_value = getattr(self, field_name)
+        if not isinstance(field_value, ctypes.Array):
+            raise RuntimeError('Field {} of {} is not an array.'.format(field_name, type(self).__name__))
+
+        # numpy cannot derive the dtype of packed structures from ctypes, use the dtype of the element class
+        if issubclass(field_value._type_, XTFBase):
+            return np.frombuffer(field_value, dtype=field_value._type_._np_dtype)
+
+        return np.ctypeslib.as_array(field_value)
+
+    def __reduce__(self):
         """
-        fields = []
-        for field_name in dir(self):
-            if not field_name.startswith('_') and not field_name.endswith('_'):
-                field_value = getattr(self, field_name)
-                field_type = type(field_value)
+        Pickles (and copies) the structure as its bytes along with the values of the slots and instance dictionary.
+        Note: ctypes.Structure.__reduce__ requires an instance dictionary, which the structures with __slots__ lack.
+        """
+        state = {name: getattr(self, name) for name in self._all_slots if hasattr(self, name)}
+        state.update(getattr(self, '__dict__', {}))
 
-                # callable(obj) will return true for the fields, using 'method' name instead
-                if not field_type.__name__ == 'method':
-                    if hasattr(self.__class__, field_name) and hasattr(getattr(self.__class__, field_name), 'offset'):
-                        offset = getattr(self.__class__, field_name).offset
-                    else:
-                        offset = 2 ** 31
+        return _unpickle_struct, (type(self), bytes(self), state)
 
-                    if ctypes.Array in field_type.__bases__ and field_type._type_ not in [ctypes.c_char, ctypes.c_wchar]:
-                        if len(field_value) > 20:
-                            val_str = field_value[:10] + ['...'] + field_value[-10:]
-                        else:
-                            val_str = list(field_value)
-                        out_str = '{}: {}\n'.format(field_name, val_str)
-                    else:
-                        out_str = '{}: {}\n'.format(field_name, field_value)
+    def __str__(self):
+        """
+        Prints the fields in the class (with ctype-fields) in the order in which they appear in the structure.
+        Properties and attributes added to the instance (e.g. data) are printed last.
+        """
+        field_names = [field_name for field_name, _ in self._all_fields]
+        extra_names = set(self._properties)
+        extra_names.update(name for name in self._slot_names if hasattr(self, name))
+        extra_names.update(name for name in getattr(self, '__dict__', {}) if not name.startswith('_'))
+        field_names.extend(sorted(extra_names))
 
-                    fields.append((offset, out_str))
+        out = []
+        for field_name in field_names:
+            field_value = getattr(self, field_name)
+            field_type = type(field_value)
 
-        # Sort by offset (non-ctypes placed last)
-        fields.sort(key=lambda x: x[0])
-        out = ''.join(field[1] for field in fields)
+            if ctypes.Array in field_type.__bases__ and field_type._type_ not in [ctypes.c_char, ctypes.c_wchar]:
+                if len(field_value) > 20:
+                    val_str = field_value[:10] + ['...'] + field_value[-10:]
+                else:
+                    val_str = list(field_value)
+                out.append('{}: {}\n'.format(field_name, val_str))
+            else:
+                out.append('{}: {}\n'.format(field_name, field_value))
 
-        return out
+        return ''.join(out)
 
 
 class XTFChanInfo(XTFBase):
+    __slots__ = ()
+    _EXPECTED_SIZE = 128
     _pack_ = 1
     _fields_ = [
         ('TypeOfChannel', ctypes.c_uint8),
@@ -158,6 +491,7 @@ class XTFChanInfo(XTFBase):
 
 
 class XTFFileHeader(XTFBase):
+    _EXPECTED_SIZE = 1024
     _pack_ = 1
     _fields_ = [
         ('FileFormat', ctypes.c_uint8),
@@ -225,11 +559,11 @@ class XTFFileHeader(XTFBase):
         super().__init__()
         self.FileFormat = 0x7B
         self.SystemType = 1
+        self.RecordingProgramName = b'pyxtf'
+        self.RecordingProgramVersion = b'223'
         # Set ChanInfo[i].Reserved to 1024 for compatibility reasons (used to be NumSamples)
         for i in range(0, 6):
             self.ChanInfo[i].Reserved = 1024
-            self.RecordingProgramName = b'pyxtf'
-            self.RecordingProgramVersion = b'223'
 
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header=None):
@@ -241,6 +575,17 @@ class XTFFileHeader(XTFBase):
         obj.sonar_info = [x for x in obj.ChanInfo if x.TypeOfChannel in sonar_types][:obj.NumberOfSonarChannels]
         obj.bathy_info = [x for x in obj.ChanInfo if x.TypeOfChannel == XTFChannelType.bathy][:obj.NumberOfBathymetryChannels]
 
+        # Plain python values of the sonar channel fields used for every ping (saves the ctypes field access)
+        obj._sonar_bps = tuple(x.BytesPerSample for x in obj.sonar_info)
+        obj._sonar_reserved = tuple(x.Reserved for x in obj.sonar_info)
+
+        # Favor getting the sample format from the dedicated field added in X41.
+        # If the field is not populated deduce the type from the bytes per sample field.
+        # None is used for unsupported sample formats (raised when reading a ping)
+        obj._sonar_dtype = tuple(
+            sample_format_dtype.get(x.SampleFormat, xtf_dtype.get(x.BytesPerSample)) for x in obj.sonar_info
+        )
+
         return obj
 
 
@@ -249,53 +594,162 @@ class XTFPacket(XTFBase):
     This is base class for all packets to derive from.
     Some packets derive from the subclass XTFPacketStart instead, due to the common first fields present in many packets
     """
+    __slots__ = ()
+
+    # Magic number of all packets, and the HeaderType assigned to new packets of the class
+    _MAGIC = 0xFACE
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.user_defined.value
     _pack_ = 1
     _fields_ = []
 
     def get_time(self):
         # All XTF packets has the fields Year, Month, Day, Hour, Minute, Second
         # Some packets come with SourceEpoch (time since 1970-1-1) which is used if present
-        # The presence of high-resolution timers vary, and will be checked for (at runtime)
+        # The presence of high-resolution timers vary, which fields are present is cached on the class
 
         # Use epoch if available, else calculate from Year-Month-Day etc
-        if hasattr(self, 'SourceEpoch') and self.SourceEpoch:
+        if self._has_SourceEpoch and self.SourceEpoch:
             p_time = np.datetime64(self.SourceEpoch, 's')
 
             # XTFAttitudeData has an additional epoch field with microseconds
             # Return immediately, as the high-precision fields added later doubles up
-            if hasattr(self, 'EpochMicroseconds') and self.EpochMicroseconds:
+            if self._has_EpochMicroseconds and self.EpochMicroseconds:
                 p_time += np.timedelta64(self.EpochMicroseconds, 'us')
                 return p_time
         else:
             # Numpy does not handle leap years and varying number of days per month
-            # Calculate the day from the python.datetime module
-            days = (date(self.Year, self.Month, self.Day) - date(self.Year, 1, 1)).days
+            # Calculate the day of the year from the cumulative number of days per month
+            # The date is validated the same way as datetime.date (raises ValueError)
+            year, month, day = self.Year, self.Month, self.Day
+            if not 1 <= year <= 9999:
+                raise ValueError('year {} is out of range'.format(year))
+            if not 1 <= month <= 12:
+                raise ValueError('month must be in 1..12')
+            is_leap = _is_leap(year)
+            if not 1 <= day <= _MONTH_DAYS[month - 1] + (month == 2 and is_leap):
+                raise ValueError('day is out of range for month')
+            days = _MDAYS[month - 1] + day - 1
+            if month > 2 and is_leap:
+                days += 1
 
             # Calculate time using common fields
-            p_time = np.datetime64(str(self.Year), 'Y') + \
+            p_time = np.datetime64(str(year), 'Y') + \
                      np.timedelta64(days, 'D') + \
                      np.timedelta64(self.Hour, 'h') + \
                      np.timedelta64(self.Minute, 'm') + \
                      np.timedelta64(self.Second, 's')
 
             # Add time using high-res fields
-            if hasattr(self, 'HSeconds'):
+            if self._has_HSeconds:
                 return p_time + np.timedelta64(self.HSeconds*10, 'ms')  # HSeconds = hundredths of a second (0-99)
 
-            if hasattr(self, 'Millisecond'):
+            if self._has_Millisecond:
                 p_time += np.timedelta64(self.Millisecond, 'ms')
 
-            if hasattr(self, 'Microsecond'):
+            if self._has_Microsecond:
                 p_time += np.timedelta64(self.Microsecond, 'us')
 
         return p_time
 
+    @classmethod
+    def get_times_bulk(cls, packets) -> np.ndarray:
+        """
+        Vectorized equivalent of get_time for a list of packets.
+        :param packets: List of packets, all of the same type
+        :return: Array of numpy.datetime64[us] (one per packet)
+        """
+        if not packets:
+            return np.empty(0, dtype='datetime64[us]')
+
+        p_class = type(packets[0])
+        records = {name: np.array([getattr(p, name) for p in packets]) for name in p_class._time_fields}
+
+        return p_class.get_times_from_records(records)
+
+    @classmethod
+    def get_times_from_records(cls, records) -> np.ndarray:
+        """
+        Calculates the time of many packets at once from the time fields (the same rules as get_time apply).
+        :param records: Structured numpy array or dictionary of arrays, indexable by the time field names of this class
+        :return: Array of numpy.datetime64[us]
+        """
+        def field(name):
+            return np.asarray(records[name], dtype=np.int64)
+
+        # Calendar arithmetic on datetime64 arrays handles leap years and the varying number of days per month
+        p_time = (field('Year') - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (field('Month') - 1)
+        p_time = p_time.astype('datetime64[D]') + (field('Day') - 1)
+        p_time = p_time.astype('datetime64[us]') + \
+                 field('Hour').astype('timedelta64[h]') + \
+                 field('Minute').astype('timedelta64[m]') + \
+                 field('Second').astype('timedelta64[s]')
+
+        # Add time using high-res fields
+        if cls._has_HSeconds:
+            p_time += (field('HSeconds') * 10).astype('timedelta64[ms]')  # HSeconds = hundredths of a second (0-99)
+        else:
+            if cls._has_Millisecond:
+                p_time += field('Millisecond').astype('timedelta64[ms]')
+
+            if cls._has_Microsecond:
+                p_time += field('Microsecond').astype('timedelta64[us]')
+
+        # Use epoch where available, the high-res fields are not added to the epoch (except EpochMicroseconds)
+        if cls._has_SourceEpoch:
+            epoch = field('SourceEpoch')
+            epoch_time = epoch.astype('datetime64[s]').astype('datetime64[us]')
+            if cls._has_EpochMicroseconds:
+                epoch_time += field('EpochMicroseconds').astype('timedelta64[us]')
+
+            p_time = np.where(epoch != 0, epoch_time, p_time)
+
+        return p_time
+
+
+_JIT_FUNCTIONS = {}
+
+
+def _jit_function(name: str):
+    """
+    Returns the Numba compiled function with the given name from pyxtf._jit, or None if Numba is not installed.
+    pyxtf._jit is only imported on first use, as importing Numba makes importing pyxtf several times slower.
+    :param name: Name of the function in pyxtf._jit
+    :return: The compiled function or None
+    """
+    try:
+        return _JIT_FUNCTIONS[name]
+    except KeyError:
+        pass
+
+    try:
+        from pyxtf import _jit
+        func = getattr(_jit, name)
+    except ImportError:
+        func = None
+    _JIT_FUNCTIONS[name] = func
+    return func
+
+
+# Use a compiled packet scan if available, the Cython extension (see setup.py) is preferred over Numba (no JIT warmup)
+try:
+    from pyxtf._fastparse import scan_packets as _scan_packets_compiled
+except ImportError:
+    _scan_packets_compiled = None
+
+
+# Equivalent of the XTFPacketStart fields, faster than constructing the ctypes structure to read a few fields
+_PACKET_START = struct.Struct('<HBBH2HI')
+
+# HeaderSize and DataSize of the SNP1 beam headers (see SNP0.read_snippets)
+_SNP_SIZES = struct.Struct('<HH')
+
 
 class XTFPacketStart(XTFPacket):
     """
     This is a structure representing the first few bytes in (most) of the XTF packets.
     It can be used to inspect the packet type before reading the whole header.
     """
+    __slots__ = ()
     _pack_ = 1
     _fields_ = [
         ('MagicNumber', ctypes.c_uint16),
@@ -310,16 +764,160 @@ class XTFPacketStart(XTFPacket):
     def create_from_buffer(cls, buffer: IOBase, file_header: XTFFileHeader=None):
         obj = super().create_from_buffer(buffer)
 
-        if obj.MagicNumber != 0xFACE:
+        if obj.MagicNumber != cls._MAGIC:
             raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
 
         return obj
 
+    @staticmethod
+    def peek(buf, offset: int = 0) -> Tuple[int, int, int]:
+        """
+        Reads the fields needed to dispatch a packet, without constructing the structure.
+        :param buf: Input bytes (or any object supporting the buffer protocol), at least XTFPacketStart._SIZE long
+        :param offset: Offset of the packet in buf
+        :return: Tuple of (MagicNumber, HeaderType, NumBytesThisRecord)
+        """
+        magic, header_type, _, _, _, _, n_bytes = _PACKET_START.unpack_from(buf, offset)
+        return magic, header_type, n_bytes
+
+    @classmethod
+    def scan_offsets(cls, mm, start: int = 0, resync: bool = False) -> np.ndarray:
+        """
+        Builds an index of the packet start positions in a (memory-mapped) XTF file.
+        The packets are followed using NumBytesThisRecord, and the magic number of all the packets is then validated
+        in one vectorized pass (instead of one check per packet).
+        :param mm: The file contents, any object supporting the buffer protocol (e.g. mmap.mmap, numpy.memmap, bytes)
+        :param start: Offset of the first packet (the size of the file header)
+        :param resync: If true, corrupt packets are skipped (with a warning) by searching for the next packet start,
+                       instead of raising a RuntimeError
+        :return: numpy.ndarray (int64) with the offset of each packet
+        """
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        n_bytes_file = len(buf)
+        n_bytes_field = cls._n_bytes_field_offsets()
+
+        offsets = []
+        offset = start
+        while offset + cls._SIZE <= n_bytes_file:
+            header_type = mm[offset + 2]
+            field_offset = offset + n_bytes_field[header_type]
+            n_bytes = struct.unpack_from('<I', mm, field_offset)[0] if field_offset + 4 <= n_bytes_file else 0
+
+            if resync and (n_bytes == 0 or mm[offset] != 0xCE or mm[offset + 1] != 0xFA):
+                next_offset = cls._find_next_packet(buf, offset + 1, n_bytes_field)
+                warn('Corrupt XTF packet at offset {}, skipped {} bytes.'.format(
+                    offset, (next_offset if next_offset is not None else n_bytes_file) - offset))
+                if next_offset is None:
+                    break
+                offset = next_offset
+                continue
+
+            offsets.append(offset)
+            if n_bytes == 0:
+                raise RuntimeError('XTF packet at offset {} has NumBytesThisRecord = 0.'.format(offset))
+            offset += n_bytes
+
+        offsets = np.array(offsets, dtype=np.int64)
+
+        # Validate the magic number of all packets at once
+        magic = buf[offsets].astype(np.uint16) | (buf[offsets + 1].astype(np.uint16) << 8)
+        invalid = np.flatnonzero(magic != cls._MAGIC)
+        if invalid.size:
+            raise RuntimeError('XTF packet at offset {} does not start with the correct identifier (0xFACE).'.format(
+                offsets[invalid[0]]))
+
+        return offsets
+
+    @classmethod
+    def scan_packets(cls, mm, start: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Builds an index of the packets in a (memory-mapped) XTF file, with the header type and size of each packet.
+        Uses a compiled loop if pyxtf._fastparse is built or Numba is installed (see pyxtf._jit),
+        else the equivalent of scan_offsets.
+        :param mm: The file contents, any object supporting the buffer protocol (e.g. mmap.mmap, numpy.memmap, bytes)
+        :param start: Offset of the first packet (the size of the file header)
+        :return: Tuple of numpy arrays (offsets int64, HeaderType uint8, NumBytesThisRecord uint32), one entry per packet
+        """
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        n_bytes_field = np.array(cls._n_bytes_field_offsets(), dtype=np.int64)
+
+        scan_packets_compiled = _scan_packets_compiled or _jit_function('scan_packets')
+        if scan_packets_compiled is None:
+            offsets = cls.scan_offsets(mm, start)
+            header_types = buf[offsets + 2]
+            field_pos = offsets + n_bytes_field[header_types]
+            sizes = buf[field_pos].astype(np.uint32) | buf[field_pos + 1].astype(np.uint32) << 8 \
+                  | buf[field_pos + 2].astype(np.uint32) << 16 | buf[field_pos + 3].astype(np.uint32) << 24
+
+            return offsets, header_types, sizes
+
+        offsets, header_types, sizes, error_offset, error = scan_packets_compiled(
+            buf, start, n_bytes_field, cls._SIZE)
+        if error == 1:
+            raise RuntimeError('XTF packet at offset {} does not start with the correct identifier (0xFACE).'.format(
+                error_offset))
+        if error == 2:
+            raise RuntimeError('XTF packet at offset {} has NumBytesThisRecord = 0.'.format(error_offset))
+
+        return offsets, header_types, sizes
+
+    @classmethod
+    def _n_bytes_field_offsets(cls) -> List[int]:
+        """
+        :return: Offset of NumBytesThisRecord for each header type (XTFRawCustomHeader differs from XTFPacketStart)
+        """
+        n_bytes_field = [cls._FIELD_OFFSETS['NumBytesThisRecord']] * 256
+        for header_type, p_class in XTFPacketClasses.items():
+            if header_type.value < 256:
+                n_bytes_field[header_type.value] = p_class._FIELD_OFFSETS['NumBytesThisRecord']
+
+        return n_bytes_field
+
+    @classmethod
+    def _find_next_packet(cls, buf: np.ndarray, pos: int, n_bytes_field, window: int = 1 << 20):
+        """
+        Finds the first packet start at or after pos, used by scan_offsets to recover from corrupt packets.
+        The candidates (occurrences of the magic number) in each window of the file are found with a vectorized
+        comparison, and a candidate is accepted if its NumBytesThisRecord leads to another magic number
+        (or to the end of the file).
+        :param buf: The file contents as a numpy.uint8 array
+        :param pos: Offset to start the search from
+        :param n_bytes_field: Offset of NumBytesThisRecord for each header type
+        :param window: Number of bytes searched per iteration
+        :return: Offset of the next packet, None if there are no more packets
+        """
+        n_bytes_file = len(buf)
+        n_bytes_field = np.asarray(n_bytes_field, dtype=np.int64)
+
+        while pos + cls._SIZE <= n_bytes_file:
+            # Compared byte-wise, packets following a corrupt packet are not necessarily aligned to 2 bytes
+            chunk = buf[pos:pos + window + 1]
+            cand = np.flatnonzero((chunk[:-1] == 0xCE) & (chunk[1:] == 0xFA)) + pos
+            cand = cand[cand + cls._SIZE <= n_bytes_file]
+
+            field_pos = cand + n_bytes_field[buf[cand + 2]]
+            cand, field_pos = cand[field_pos + 4 <= n_bytes_file], field_pos[field_pos + 4 <= n_bytes_file]
+            n_bytes = buf[field_pos].astype(np.int64) | buf[field_pos + 1].astype(np.int64) << 8 \
+                    | buf[field_pos + 2].astype(np.int64) << 16 | buf[field_pos + 3].astype(np.int64) << 24
+
+            # Validate the linkage to the following packet, the last packet must still end within the file
+            next_pos = cand + n_bytes
+            at_end = (next_pos <= n_bytes_file) & (next_pos + cls._SIZE > n_bytes_file)
+            next_pos = np.minimum(next_pos, n_bytes_file - 2)
+            is_valid = (n_bytes > 0) & (at_end | ((buf[next_pos] == 0xCE) & (buf[next_pos + 1] == 0xFA)))
+
+            valid = np.flatnonzero(is_valid)
+            if valid.size:
+                return int(cand[valid[0]])
+            pos += window
+
+        return None
+
     def __init__(self):
         super().__init__()
 
-        self.MagicNumber = 0xFACE
-        self.HeaderType = XTFHeaderType.user_defined
+        self.MagicNumber = self._MAGIC
+        self.HeaderType = self._DEFAULT_HEADER_TYPE
 
 
 class XTFUnknownPacket(XTFPacketStart):
@@ -327,6 +925,7 @@ class XTFUnknownPacket(XTFPacketStart):
     Class for packets without a known implementation. Any data after the header is returned as bytes
     Note: If you have documentation for any of these structures, please let me know
     """
+    __slots__ = ('data',)
     def __init__(self):
         super().__init__()
         self.data = b''
@@ -335,14 +934,59 @@ class XTFUnknownPacket(XTFPacketStart):
     def create_from_buffer(cls, buffer: IOBase, file_header: XTFFileHeader=None):
         obj = super().create_from_buffer(buffer)
 
-        n_bytes = obj.NumBytesThisRecord - ctypes.sizeof(cls)
+        n_bytes = obj.NumBytesThisRecord - cls._SIZE
         obj.data = buffer.read(n_bytes)
 
         return obj
 
 
+def _read_packet_records(cls, header_type: XTFHeaderType, buffer, count: int = -1) -> np.recarray:
+    """
+    Reads a run of consecutive fixed-size packets into a structured numpy array (one row per packet).
+    The packet size is taken from NumBytesThisRecord of the first packet, any padding is skipped.
+    :param cls: The packet class
+    :param header_type: The expected header type of the packets
+    :param buffer: Input bytes or a file-like object positioned at the start of the first packet
+    :param count: Number of packets to read, -1 reads until the end of the buffer
+    :return: numpy.recarray with the packet fields as columns
+    """
+    if type(buffer) in [bytes, bytearray, memoryview]:
+        buffer = BytesIO(buffer)
+
+    # Peek at the first packet to get the distance between consecutive packets
+    pos = buffer.tell()
+    start_bytes = buffer.read(XTFPacketStart._SIZE)
+    if len(start_bytes) < XTFPacketStart._SIZE:
+        raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+    buffer.seek(pos)
+    _, _, n_bytes_record = XTFPacketStart.peek(start_bytes)
+    n_bytes = max(n_bytes_record, cls._SIZE)
+
+    packet_bytes = buffer.read(n_bytes * count if count >= 0 else -1)
+    if count >= 0 and len(packet_bytes) < n_bytes * count:
+        raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+
+    # Stretch the dtype to the size of the packets, such that padding is skipped
+    dtype = np.dtype((np.record, {
+        'names': cls._np_dtype.names,
+        'formats': [cls._np_dtype.fields[name][0] for name in cls._np_dtype.names],
+        'offsets': [cls._np_dtype.fields[name][1] for name in cls._np_dtype.names],
+        'itemsize': n_bytes
+    }))
+    records = np.frombuffer(packet_bytes, dtype=dtype, count=len(packet_bytes) // n_bytes)
+
+    if np.any(records['MagicNumber'] != cls._MAGIC):
+        raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
+    if np.any(records['HeaderType'] != header_type) or np.any(records['NumBytesThisRecord'] != n_bytes):
+        raise RuntimeError('Buffer does not contain a run of {} packets of equal size.'.format(cls.__name__))
+
+    return records.view(np.recarray)
+
 
 class XTFAttitudeData(XTFPacketStart):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.attitude.value
+    _EXPECTED_SIZE = 64
     _pack_ = 1
     _fields_ = [
         ('Reserved2', ctypes.c_uint32 * 2),
@@ -364,12 +1008,21 @@ class XTFAttitudeData(XTFPacketStart):
         ('Reserved3', ctypes.c_uint8)
         ]
 
-    def __init__(self):
-        super().__init__()
-        self.HeaderType = XTFHeaderType.attitude
+    @classmethod
+    def bulk_read(cls, buffer, count: int = -1) -> np.recarray:
+        """
+        Reads a run of consecutive attitude packets into a structured numpy array, instead of one object per packet.
+        :param buffer: Input bytes or a file-like object positioned at the start of the first packet
+        :param count: Number of packets to read, -1 reads until the end of the buffer
+        :return: numpy.recarray with the packet fields as columns (e.g. records.Pitch)
+        """
+        return _read_packet_records(cls, XTFHeaderType.attitude, buffer, count)
 
 
 class XTFNotesHeader(XTFPacketStart):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.notes.value
+    _EXPECTED_SIZE = 256
     _pack_ = 1
     _fields_ = [
         ('Year', ctypes.c_uint16),
@@ -382,12 +1035,9 @@ class XTFNotesHeader(XTFPacketStart):
         ('NotesText', ctypes.c_char * 200)
     ]
 
-    def __init__(self):
-        super().__init__()
-        self.HeaderType = XTFHeaderType.notes.value
-
 
 class XTFRawSerialHeader(XTFPacketStart):
+    _EXPECTED_SIZE = 30
     _pack_ = 1
     _fields_ = [
         ('Year', ctypes.c_uint16),
@@ -406,7 +1056,7 @@ class XTFRawSerialHeader(XTFPacketStart):
     def create_from_buffer(cls, buffer: IOBase, file_header: XTFFileHeader=None):
         obj = super().create_from_buffer(buffer)
         # TODO: Make getters/setters that updates StringSize when changed
-        obj.RawAsciiData = buffer.read(ctypes.sizeof(ctypes.c_char) * obj.StringSize.value)
+        obj.RawAsciiData = buffer.read(obj.StringSize)
 
         return obj
 
@@ -435,6 +1085,8 @@ class XTFRawSerialHeader(XTFPacketStart):
 
 
 class XTFPingChanHeader(XTFBase):
+    __slots__ = ()
+    _EXPECTED_SIZE = 64
     _pack_ = 1
     _fields_ = [
         ('ChannelNumber', ctypes.c_uint16),
@@ -464,7 +1116,79 @@ class XTFPingChanHeader(XTFBase):
     ]
 
 
+# NumSamples of the XTFPingChanHeader (see _parse_sonar_channels_py)
+_UINT32 = struct.Struct('<I')
+
+
+def _parse_sonar_channels_py(packet_bytes, n_chans: int, n_bytes_packet: int,
+                             sonar_bps: tuple, sonar_reserved: tuple, chan_dtype: np.dtype):
+    """
+    Walks the channel headers and samples following the XTFPingHeader of a sonar ping.
+    Note: The compiled version in pyxtf._fastparse is used instead if it has been built.
+    :param packet_bytes: The bytes following the XTFPingHeader
+    :param n_chans: Number of channels in the ping (NumChansToFollow)
+    :param n_bytes_packet: Number of bytes in the packet following the XTFPingHeader
+    :param sonar_bps: Bytes per sample of each sonar channel
+    :param sonar_reserved: Reserved (old NumSamples) field of each sonar channel
+    :param chan_dtype: The numpy dtype of XTFPingChanHeader
+    :return: Structured array of channel headers, list of (offset, n_bytes) of the samples in each channel
+    """
+    chan_size = chan_dtype.itemsize
+    n_samples_offset = chan_dtype.fields['NumSamples'][1]
+    n_bytes_read = len(packet_bytes)
+    chan_offsets = []
+    sample_slices = []
+    offset = 0
+
+    for i in range(0, n_chans):
+        # Only NumSamples is read here, the XTFPingChanHeaders are copied into the structured array at the end
+        if offset + chan_size > n_bytes_read:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading XTFPingChanHeader)')
+        chan_offsets.append(offset)
+        n_samples, = _UINT32.unpack_from(packet_bytes, offset + n_samples_offset)
+        offset += chan_size
+
+        # Backwards-compatibility: retrive from NumSamples if possible, else use old field
+        n_samples = n_samples if n_samples > 0 else sonar_reserved[i]
+
+        # Calculate number of bytes to read
+        n_bytes = n_samples * sonar_bps[i]
+        if offset + n_bytes > n_bytes_packet:
+            raise RuntimeError('Number of bytes to read exceeds the number of bytes remaining in packet.')
+        if offset + n_bytes > n_bytes_read:
+            raise RuntimeError('File ended while reading data packets (file corrupt?)')
+
+        sample_slices.append((offset, n_bytes))
+        offset += n_bytes
+
+    # One (writable) copy of all the channel headers
+    chan_bytes = bytearray().join([packet_bytes[chan_offset:chan_offset + chan_size] for chan_offset in chan_offsets])
+    chan_headers = np.frombuffer(chan_bytes, dtype=chan_dtype)
+
+    return chan_headers, sample_slices
+
+
+# Use the compiled ping parser if the optional extension has been built
+try:
+    from pyxtf._fastparse import parse_sonar_channels as _parse_sonar_channels
+except ImportError:
+    _parse_sonar_channels = _parse_sonar_channels_py
+
+
+# Empty channel headers of the pings without any (bathymetry and raw vendor data)
+_NO_PING_CHAN_HEADERS = XTFPingChanHeader.from_buffer_bulk(b'', 0)
+
+# HeaderType of the pings handled separately by XTFPingHeader._read_payload (ints compare faster than the enum)
+_HEADER_TYPE_SONAR = XTFHeaderType.sonar.value
+_HEADER_TYPE_BATHY_XYZA = XTFHeaderType.bathy_xyza.value
+_HEADER_TYPE_RESON_7018 = XTFHeaderType.reson_7018_watercolumn.value
+
+
 class XTFPingHeader(XTFPacketStart):
+    # The attributes following the header are slots, to avoid allocating an instance dictionary per ping
+    __slots__ = ('ping_chan_headers', 'data')
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.sonar.value
+    _EXPECTED_SIZE = 256
     _pack_ = 1
     _fields_ = [
         ('Year', ctypes.c_uint16),
@@ -546,92 +1270,103 @@ class XTFPingHeader(XTFPacketStart):
     # TODO: Generate it automatically by inspecing __init__
     _typing_static_ = []
     _typing_instance_ = [
-        ('ping_chan_headers', 'List[XTFPingChanHeader]'),
+        ('ping_chan_headers', 'np.recarray'),
         ('data', 'List[np.ndarray]')
     ]
 
-    _bathy_header_types = [
+    _bathy_header_types = frozenset([
             XTFHeaderType.bathy_xyza.value,
             XTFHeaderType.bathy.value,
-            XTFHeaderType.multibeam_raw_beam_angle
-        ]
+            XTFHeaderType.multibeam_raw_beam_angle.value
+        ])
 
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header: XTFFileHeader=None):
         if not file_header:
             raise RuntimeError('Initialization of XTFPingHeader from buffer requires file_header to be passed.')
+        if type(buffer) in [bytes, bytearray]:
+            buffer = BytesIO(buffer)
 
         obj = super().create_from_buffer(buffer=buffer)
+        cls._read_payload(obj, buffer, file_header)
 
-        obj.ping_chan_headers = []  # type: List[XTFPingChanHeader]
-        obj.data = None
-
-        # Sonar and bathy has a different data structure following the header
-        if obj.HeaderType == XTFHeaderType.sonar:
-            obj.data = []  # type: List[np.ndarray]
+        return obj
 
-            bytes_remaining = obj.NumBytesThisRecord - ctypes.sizeof(XTFPingHeader)
+    @staticmethod
+    def _read_payload(obj, buffer: IOBase, file_header: XTFFileHeader):
+        """
+        Reads the channel headers and data following the header, and assigns them to obj.
+        Shared with XTFPingHeaderLazy, only the fields HeaderType, NumChansToFollow and NumBytesThisRecord are used.
+        :param obj: XTFPingHeader or XTFPingHeaderLazy, the buffer is positioned at the end of its header
+        :param buffer: Input bytes
+        :param file_header: XTFFileHeader of the file
+        """
+        # The channel headers are stored as rows in a structured array (fields accessible as attributes)
+        # Packets without channel headers share a single empty (read-only) array
+        header_type = obj.HeaderType
 
-            for i in range(0, obj.NumChansToFollow):
-                # Retrieve XTFPingChanHeader for this channel
-                p_chan = XTFPingChanHeader.create_from_buffer(buffer=buffer)
-                obj.ping_chan_headers.append(p_chan)
-                bytes_remaining -= ctypes.sizeof(XTFPingChanHeader)
+        # NumBytesThisRecord includes the headers, a smaller value would read the remainder of the file as payload
+        n_bytes_payload = obj.NumBytesThisRecord - XTFPingHeader._SIZE
+        if header_type == _HEADER_TYPE_RESON_7018:
+            n_bytes_payload -= XTFPingChanHeader._SIZE
+        if n_bytes_payload < 0:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(type(obj).__name__))
 
-                # Backwards-compatibility: retrive from NumSamples if possible, else use old field
-                n_samples = p_chan.NumSamples if p_chan.NumSamples > 0 else file_header.sonar_info[i].Reserved
+        # Sonar and bathy has a different data structure following the header
+        if header_type == _HEADER_TYPE_SONAR:
+            data = []  # type: List[np.ndarray]
 
-                # Calculate number of bytes to read
-                n_bytes = n_samples * file_header.sonar_info[i].BytesPerSample
-                if n_bytes > bytes_remaining:
-                    raise RuntimeError('Number of bytes to read exceeds the number of bytes remaining in packet.')
+            # Read the remainder of the packet with a single read, the channel headers and samples are
+            # then taken from (zero-copy) slices of this block instead of reading each one separately
+            packet_bytes = memoryview(buffer.read(n_bytes_payload))
 
-                # Read the data and output as a numpy array of the specified bytes-per-sample
-                samples = buffer.read(n_bytes)
-                if not samples:
-                    raise RuntimeError('File ended while reading data packets (file corrupt?)')
+            chan_headers, sample_slices = _parse_sonar_channels(
+                packet_bytes, obj.NumChansToFollow, n_bytes_payload,
+                file_header._sonar_bps, file_header._sonar_reserved, XTFPingChanHeader._np_record_dtype)
 
-                bytes_remaining -= len(samples)
+            for i, (offset, n_bytes) in enumerate(sample_slices):
+                # Output as the sample type of this channel (see XTFFileHeader.create_from_buffer)
+                sample_dtype = file_header._sonar_dtype[i]
+                if sample_dtype is None:
+                    raise RuntimeError('Unsupported sample format or bytes per sample in sonar channel {}.'.format(i))
 
-                # Favor getting the sample format from the dedicated field added in X41.
-                # If the field is not populated deduce the type from the bytes per sample field.
-                try:
-                    sample_dtype = sample_format_dtype[file_header.sonar_info[i].SampleFormat]
-                except KeyError:
-                    sample_dtype = xtf_dtype[file_header.sonar_info[i].BytesPerSample]
+                data.append(np.frombuffer(packet_bytes[offset:offset + n_bytes], dtype=sample_dtype))
 
-                samples = np.frombuffer(samples, dtype=sample_dtype)
-                obj.data.append(samples)
+            obj.ping_chan_headers = chan_headers.view(np.recarray)
+            obj.data = data
 
-        elif obj.HeaderType == XTFHeaderType.bathy_xyza:
+        elif header_type == _HEADER_TYPE_BATHY_XYZA:
             # Bathymetry uses the same header as sonar, but without the XTFPingChanHeaders
 
             # TODO: Should the sub-channel number be used to index chan_info (?)
             # sub_chan = obj.SubChannelNumber
 
             # Read the data that follows
-            n_bytes = obj.NumBytesThisRecord - ctypes.sizeof(XTFPingHeader)
-            samples = buffer.read(n_bytes)
+            samples = buffer.read(n_bytes_payload)
             if not samples:
                 warn('XTFBathyHeader without any data encountered.')
 
             # Processed bathy data consists of repeated XTFBeamXYZA structures
-            # Note: Using a ctypes array is a _lot_ faster than constructing a list of BeamXYZA
-            num_xyza = n_bytes // ctypes.sizeof(XTFBeamXYZA)
-            xyza_array_type = XTFBeamXYZA * num_xyza
-            xyza_array_type._pack_ = 1
-            obj.data = xyza_array_type.from_buffer_copy(samples)
-
-        elif obj.HeaderType == XTFHeaderType.reson_7018_watercolumn:
+            # Note: Using a structured numpy array is a _lot_ faster than constructing a list of BeamXYZA,
+            #       the recarray view keeps attribute access (data[i].fDepth) and gives columns (data.fDepth)
+            # The beams are writable, read-only data is copied (writable memory-mapped views are kept as views)
+            if memoryview(samples).readonly:
+                samples = bytearray(samples)
+            obj.ping_chan_headers = _NO_PING_CHAN_HEADERS
+            obj.data = XTFBeamXYZA.from_buffer_bulk(samples)
+
+        elif header_type == _HEADER_TYPE_RESON_7018:
             # 7018 water column consists of XTFPingHeader followed by (one?) XTFPingChanHeader, then vendor data
 
             # Retrieve XTFPingChanHeader
-            p_chan = XTFPingChanHeader.create_from_buffer(buffer=buffer)
-            obj.ping_chan_headers.append(p_chan)
+            chan_bytes = buffer.read(XTFPingChanHeader._SIZE)
+            if len(chan_bytes) < XTFPingChanHeader._SIZE:
+                raise RuntimeError('XTF file shorter than expected (end hit while reading XTFPingChanHeader)')
+            # Writable (copy) as the channel headers of the sonar pings
+            obj.ping_chan_headers = XTFPingChanHeader.from_buffer_bulk(bytearray(chan_bytes), 1)
 
             # Read the data that follows
-            n_bytes = obj.NumBytesThisRecord - ctypes.sizeof(XTFPingHeader) - ctypes.sizeof(XTFPingChanHeader)
-            samples = buffer.read(n_bytes)
+            samples = buffer.read(n_bytes_payload)
             if not samples:
                 warn('XTFPingHeader (Reson7018) without any data encountered.')
 
@@ -639,22 +1374,83 @@ class XTFPingHeader(XTFPacketStart):
 
         else:
             # Generic XTFPingHeader construction
-            n_bytes = obj.NumBytesThisRecord - ctypes.sizeof(XTFPingHeader)
-            samples = buffer.read(n_bytes)
-            if not samples and n_bytes > 0:
+            samples = buffer.read(n_bytes_payload)
+            if not samples and n_bytes_payload > 0:
                 warn('XTFPingHeader without any data encountered.')
 
             # The data is the raw bytes following the header
+            obj.ping_chan_headers = _NO_PING_CHAN_HEADERS
             obj.data = samples
 
+
+class XTFPingHeaderLazy(XTFPingHeader):
+    """
+    XTFPingHeader which defers parsing the channel headers and data until either of them is first accessed.
+    Faster for uses that only need the header fields (e.g. PingNumber and the navigation) of many pings.
+    Note: The ctypes header fields are already decoded on access only, constructing the header is a single copy.
+    """
+    __slots__ = ('_payload', '_file_header')
+    _pack_ = 1
+    _fields_ = []
+
+    @classmethod
+    def create_from_buffer(cls, buffer: IOBase, file_header: XTFFileHeader=None):
+        if not file_header:
+            raise RuntimeError('Initialization of XTFPingHeaderLazy from buffer requires file_header to be passed.')
+        if type(buffer) in [bytes, bytearray]:
+            buffer = BytesIO(buffer)
+
+        # Read the header only, keep the remainder of the packet for _parse_payload
+        obj = super(XTFPingHeader, cls).create_from_buffer(buffer=buffer)
+        n_bytes_payload = obj.NumBytesThisRecord - cls._SIZE
+        if n_bytes_payload < 0:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+        obj._payload = buffer.read(n_bytes_payload)
+        obj._file_header = file_header
+
         return obj
 
-    def __init__(self):
-        super().__init__()
-        self.HeaderType = XTFHeaderType.sonar.value
+    def __reduce__(self):
+        # Parse the payload before pickling, the pickled ping is independent of the file (e.g. a memory-mapped view)
+        if getattr(self, '_payload', None) is not None:
+            self._parse_payload()
+
+        return super().__reduce__()
+
+    def _parse_payload(self):
+        payload = self._payload
+        self._payload = None
+
+        # Keep views of memory-mapped files as views (see XTFBase.from_mmap)
+        payload_buffer = _XTFBufferView(payload) if isinstance(payload, memoryview) else BytesIO(payload)
+        XTFPingHeader._read_payload(self, payload_buffer, self._file_header)
+
+    # The properties below shadow the slots of XTFPingHeader, which are accessed through their descriptors
+    @property
+    def ping_chan_headers(self) -> np.recarray:
+        if getattr(self, '_payload', None) is not None:
+            self._parse_payload()
+        return XTFPingHeader.ping_chan_headers.__get__(self)
+
+    @ping_chan_headers.setter
+    def ping_chan_headers(self, value):
+        XTFPingHeader.ping_chan_headers.__set__(self, value)
+
+    @property
+    def data(self):
+        if getattr(self, '_payload', None) is not None:
+            self._parse_payload()
+        return XTFPingHeader.data.__get__(self)
+
+    @data.setter
+    def data(self, value):
+        XTFPingHeader.data.__set__(self, value)
 
 
 class XTFPosRawNavigation(XTFPacketStart):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.pos_raw_navigation.value
+    _EXPECTED_SIZE = 64
     _pack_ = 1
     _fields_ = [
         ('Year', ctypes.c_uint16),
@@ -674,12 +1470,20 @@ class XTFPosRawNavigation(XTFPacketStart):
         ('Reserved2', ctypes.c_uint8)
     ]
 
-    def __init__(self):
-        super().__init__()
-        self.HeaderType = XTFHeaderType.pos_raw_navigation.value
+    @classmethod
+    def bulk_read(cls, buffer, count: int = -1) -> np.recarray:
+        """
+        Reads a run of consecutive raw navigation packets into a structured numpy array.
+        :param buffer: Input bytes or a file-like object positioned at the start of the first packet
+        :param count: Number of packets to read, -1 reads until the end of the buffer
+        :return: numpy.recarray with the packet fields as columns (e.g. records.RawXcoordinate)
+        """
+        return _read_packet_records(cls, XTFHeaderType.pos_raw_navigation, buffer, count)
 
 
 class XTFQPSSingleBeam(XTFPacketStart):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.q_singlebeam.value
     _pack_ = 1
     _fields_ = [
         ('TimeTag', ctypes.c_uint32),
@@ -698,12 +1502,12 @@ class XTFQPSSingleBeam(XTFPacketStart):
         ('Reserved2', ctypes.c_uint8 * 7)
     ]
 
-    def __init__(self):
-        super().__init__()
-        self.HeaderType = XTFHeaderType.q_singlebeam.value
-
 
 class XTFQPSMultiTXEntry(XTFBase):
+    """
+    Note: Use entry.asarray('Reserved') to get the reserved values as a numpy array (not list(entry.Reserved)).
+    """
+    __slots__ = ()
     _pack_ = 1
     _fields_ = [
         ('Id', ctypes.c_int),
@@ -719,6 +1523,10 @@ class XTFQPSMultiTXEntry(XTFBase):
 
 
 class XTFQPSMBEEntry(XTFBase):
+    """
+    Note: Use entry.asarray('Reserved') to get the reserved values as a numpy array (not list(entry.Reserved)).
+    """
+    __slots__ = ()
     _pack_ = 1
     _fields_ = [
         ('Id', ctypes.c_int),
@@ -734,13 +1542,15 @@ class XTFQPSMBEEntry(XTFBase):
 
 
 class XTFRawCustomHeader(XTFPacket):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.custom_vendor_data.value
     _pack_ = 1
     _fields_ = [
         ('MagicNumber', ctypes.c_uint16),
         ('HeaderType', ctypes.c_uint8),
         ('ManufacturerID', ctypes.c_uint8),
         ('SonarID', ctypes.c_uint16),
-        ('PacketID', ctypes.c_uint16 * 2),
+        ('PacketID', ctypes.c_uint32),  # Two 16-bit words, the first in the low bits
         ('Reserved1', ctypes.c_uint32),
         ('NumBytesThisRecord', ctypes.c_uint32),
         ('Id', ctypes.c_int32),
@@ -761,18 +1571,21 @@ class XTFRawCustomHeader(XTFPacket):
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header=None):
         obj = super().create_from_buffer(buffer=buffer)
-        if obj.MagicNumber != 0xFACE:
+        if obj.MagicNumber != cls._MAGIC:
             raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
 
         return obj
 
     def __init__(self):
         super().__init__()
-        self.MagicNumber = 0xFACE
-        self.HeaderType = XTFHeaderType.custom_vendor_data.value
+        self.MagicNumber = self._MAGIC
+        self.HeaderType = self._DEFAULT_HEADER_TYPE
 
 
 class XTFHeaderNavigation(XTFPacket):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.navigation.value
+    _EXPECTED_SIZE = 64
     _pack_ = 1
     _fields_ = [
         ('MagicNumber', ctypes.c_uint16),
@@ -798,18 +1611,28 @@ class XTFHeaderNavigation(XTFPacket):
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header=None):
         obj = super().create_from_buffer(buffer=buffer)
-        if obj.MagicNumber != 0xFACE:
+        if obj.MagicNumber != cls._MAGIC:
             raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
 
         return obj
 
     def __init__(self):
         super().__init__()
-        self.MagicNumber = 0xFACE
-        self.HeaderType = XTFHeaderType.navigation.value
+        self.MagicNumber = self._MAGIC
+        self.HeaderType = self._DEFAULT_HEADER_TYPE
+
+
+# Use the compiled gyro parser if the optional extension has been built
+try:
+    from pyxtf._fastparse import parse_gyro as _parse_gyro
+except ImportError:
+    _parse_gyro = None
 
 
 class XTFHeaderGyro(XTFPacket):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.gyro.value
+    _EXPECTED_SIZE = 64
     _pack_ = 1
     _fields_ = [
         ('MagicNumber', ctypes.c_uint16),
@@ -833,18 +1656,74 @@ class XTFHeaderGyro(XTFPacket):
     @classmethod
     def create_from_buffer(cls, buffer: IOBase, file_header=None):
         obj = super().create_from_buffer(buffer=buffer)
-        if obj.MagicNumber != 0xFACE:
+        if obj.MagicNumber != cls._MAGIC:
             raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
 
         return obj
 
+    @classmethod
+    def from_offsets(cls, buffer, offsets) -> np.recarray:
+        """
+        Gathers the gyro packets at the given offsets into a structured numpy array, see XTFBase.from_offsets.
+        Note: The compiled version in pyxtf._fastparse is used if it has been built.
+        :param buffer: Input bytes, or any object supporting the buffer protocol (e.g. mmap)
+        :param offsets: Offset of each gyro packet in the buffer
+        :return: numpy.recarray with the packet fields as columns
+        """
+        if _parse_gyro is not None:
+            buf = np.frombuffer(buffer, dtype=np.uint8)
+            offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+            return _parse_gyro(buf, offsets, cls._np_record_dtype).view(np.recarray)
+
+        records = super().from_offsets(buffer, offsets)
+        if np.any(records.MagicNumber != cls._MAGIC):
+            raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
+
+        return records
+
+    @classmethod
+    def extract(cls, buffer, offsets) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reads the time and heading of the gyro packets at the given offsets into numpy arrays.
+        Uses a compiled loop running in parallel over the packets if Numba is installed (see pyxtf._jit),
+        else the packets are gathered with from_offsets.
+        :param buffer: Input bytes, or any object supporting the buffer protocol (e.g. mmap)
+        :param offsets: Offset of each gyro packet in the buffer, e.g. from XTFPacketStart.scan_packets
+        :return: Tuple of (numpy.datetime64[us] time, float32 Gyro) arrays, one entry per packet
+        """
+        extract_gyro_jit = _jit_function('extract_gyro')
+        if extract_gyro_jit is None:
+            records = cls.from_offsets(buffer, offsets)
+            return cls.get_times_from_records(records), records.Gyro.astype(np.float32)
+
+        buf = np.frombuffer(buffer, dtype=np.uint8)
+        offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+
+        # The compiled loop does not check the bounds or the magic number, validate all the packets up front
+        if offsets.size:
+            if offsets.min() < 0 or offsets.max() + cls._SIZE > buf.shape[0]:
+                raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+            if np.any((buf[offsets] != 0xCE) | (buf[offsets + 1] != 0xFA)):
+                raise RuntimeError('XTF packet does not start with the correct identifier (0xFACE).')
+
+        field_offsets = np.array([cls._FIELD_OFFSETS[name] for name in (
+            'Year', 'Month', 'Day', 'Hour', 'Minute', 'Second', 'Microsecond', 'SourceEpoch', 'Gyro')], dtype=np.int64)
+        times = np.empty(offsets.shape[0], dtype=np.int64)
+        gyro = np.empty(offsets.shape[0], dtype=np.float32)
+        extract_gyro_jit(buf, offsets, field_offsets, times, gyro)
+
+        return times.view('datetime64[us]'), gyro
+
     def __init__(self):
         super().__init__()
-        self.MagicNumber = 0xFACE
-        self.HeaderType = XTFHeaderType.gyro.value
+        self.MagicNumber = self._MAGIC
+        self.HeaderType = self._DEFAULT_HEADER_TYPE
 
 
 class XTFHighSpeedSensor(XTFPacketStart):
+    __slots__ = ()
+    _DEFAULT_HEADER_TYPE = XTFHeaderType.highspeed_sensor2.value
+    _EXPECTED_SIZE = 64
     _pack_ = 1
     _fields_ = [
         ('Year', ctypes.c_uint16),
@@ -859,12 +1738,10 @@ class XTFHighSpeedSensor(XTFPacketStart):
         ('Reserved3', ctypes.c_uint8 * 34)
     ]
 
-    def __init__(self):
-        super().__init__()
-        self.HeaderType = XTFHeaderType.highspeed_sensor2.value
-
 
 class XTFBeamXYZA(XTFBase):
+    __slots__ = ()
+    _EXPECTED_SIZE = 31
     _pack_ = 1
     _fields_ = [
         ('dPosOffsetTrX', ctypes.c_double),
@@ -877,6 +1754,8 @@ class XTFBeamXYZA(XTFBase):
 
 
 class SNP0(XTFBase):
+    __slots__ = ()
+    _EXPECTED_SIZE = 74
     _pack_ = 1
     _fields_ = [
         ('ID', ctypes.c_uint32),                # Identifier code. SNP0= 0x534E5030
@@ -886,7 +1765,7 @@ class SNP0(XTFBase):
         ('Seconds', ctypes.c_uint32),           # Time since 00:00:00 1-Jan-1970
         ('Millisec', ctypes.c_uint32),
         ('Latency', ctypes.c_uint16),           # Time from ping to output (ms)
-        ('SonarID', ctypes.c_uint16 * 2),       # Least significant four bytes of ethernet address
+        ('SonarID', ctypes.c_uint32),           # Least significant four bytes of ethernet address
         ('SonarModel', ctypes.c_uint16),        # Coded model number of sonar
         ('Frequency', ctypes.c_uint16),         # Sonar frequency (kHz)
         ('SSpeed', ctypes.c_uint16),            # Programmed sound velocity (m/sec)
@@ -908,7 +1787,7 @@ class SNP0(XTFBase):
         ('MinDepth', ctypes.c_uint16),          # Depth filter settings
         ('MaxDepth', ctypes.c_uint16),          # Depth filter settings
         ('Filters', ctypes.c_uint16),           # Enabled filters, b1 = depth, b0 = range
-        ('bFlags', ctypes.c_uint8 * 2),         # b0..11 spare, b12-14 snipMode, b15 RollStab, b16 RollStab enabled
+        ('bFlags', ctypes.c_uint16),            # b0..11 spare, b12-14 snipMode, b15 RollStab, b16 RollStab enabled
         ('HeadTemp', ctypes.c_int16),           # Head temperature, 0.1C steps
         ('BeamCnt', ctypes.c_uint16)            # Number of beams
     ]
@@ -925,8 +1804,52 @@ class SNP0(XTFBase):
         super().__init__()
         self.ID = 0x534E5030
 
+    @classmethod
+    def read_snippets(cls, buffer) -> Tuple['SNP0', np.recarray, List[np.ndarray]]:
+        """
+        Parses a SNP0 header and the BeamCnt SNP1 beam headers (each followed by its snippet samples) that follow it.
+        The beam headers are returned as rows of a structured array instead of constructing a SNP1 for each beam.
+        :param buffer: Input bytes (or any object supporting the buffer protocol), the SNP0 header starts at offset 0
+        :return: Tuple of (SNP0, numpy.recarray of the SNP1 fields, list of the samples (uint16) of each beam)
+        """
+        buffer = memoryview(buffer).cast('B')
+        n_bytes_buffer = len(buffer)
+        if n_bytes_buffer < cls._SIZE:
+            raise RuntimeError('XTF file shorter than expected (end hit while reading {})'.format(cls.__name__))
+        snp0 = cls.create_from_buffer(buffer[:cls._SIZE].tobytes())
+
+        # The beam headers are interleaved with the samples, find the offset of each (only the sizes are read)
+        beam_offsets = np.empty(snp0.BeamCnt, dtype=np.int64)
+        data_sizes = np.empty(snp0.BeamCnt, dtype=np.int64)
+        offset = max(snp0.HeaderSize, cls._SIZE)
+        for i in range(snp0.BeamCnt):
+            if offset + SNP1._SIZE > n_bytes_buffer:
+                raise RuntimeError('XTF file shorter than expected (end hit while reading SNP1)')
+            header_size, data_size = _SNP_SIZES.unpack_from(buffer, offset + SNP1._FIELD_OFFSETS['HeaderSize'])
+            header_size = max(header_size, SNP1._SIZE)
+            if offset + header_size + data_size > n_bytes_buffer:
+                raise RuntimeError('Number of bytes to read exceeds the number of bytes remaining in packet.')
+
+            beam_offsets[i] = offset
+            data_sizes[i] = data_size
+            offset += header_size + data_size
+
+        # Gather all the beam headers with a single fancy index
+        beams = SNP1.from_offsets(buffer, beam_offsets)
+        if np.any(beams.ID != 0x534E5031):
+            raise RuntimeError('XTF packet does not start with the correct identifier (0x534E5031).')
+
+        # The samples are views of the buffer
+        data_offsets = beam_offsets + np.maximum(beams.HeaderSize, SNP1._SIZE)
+        samples = [np.frombuffer(buffer, dtype='<u2', count=n_bytes // 2, offset=data_offset)
+                   for data_offset, n_bytes in zip(data_offsets.tolist(), data_sizes.tolist())]
+
+        return snp0, beams, samples
+
 
 class SNP1(XTFBase):
+    __slots__ = ()
+    _EXPECTED_SIZE = 24
     _pack_ = 1
     _fields_ = [
         ('ID', ctypes.c_uint32),            # Identifier code. SNP1= 0x534E5031
@@ -954,9 +1877,9 @@ class SNP1(XTFBase):
         self.ID = 0x534E5031
 
 
-# Mapping from enumerated header type to the class implementation
-# TODO: XTF bathy snippets (SNP0/SNP1 etc) requires a custom implementation in xtf_read
-XTFPacketClasses = {
+# Mapping from enumerated header type to the class implementation (read-only, see _XTF_PACKET_CLASS_TABLE)
+# TODO: XTF bathy snippets (SNP0/SNP1 etc) requires a custom implementation in xtf_read (see SNP0.read_snippets)
+XTFPacketClasses = MappingProxyType({
     XTFHeaderType.sonar: XTFPingHeader,
     XTFHeaderType.bathy: XTFPingHeader,
     XTFHeaderType.bathy_xyza: XTFPingHeader,
@@ -975,27 +1898,14 @@ XTFPacketClasses = {
     XTFHeaderType.sourcetime_gyro: XTFHeaderGyro,
     XTFHeaderType.highspeed_sensor2: XTFHighSpeedSensor,
     XTFHeaderType.unknown: XTFUnknownPacket
-}
-
-
-if __name__ == '__main__':
-    # TODO: Move these assertions to a test routine
-    header_sizes = [
-        (XTFFileHeader, 1024),
-        (XTFChanInfo, 128),
-        (XTFAttitudeData, 64),
-        (XTFNotesHeader, 256),
-        (XTFRawSerialHeader, 30),
-        (XTFPingHeader, 256),
-        (XTFPingChanHeader, 64),
-        (XTFHighSpeedSensor, 64),
-        (XTFBeamXYZA, 31),
-        (XTFHeaderGyro, 64),
-        (SNP0, 74),
-        (SNP1, 24)
-    ]
-    for (xtf_header, n_bytes) in header_sizes:
-        assert ctypes.sizeof(xtf_header) == n_bytes, \
-            "{} expected size is {} bytes, was {} bytes".format(xtf_header.__name__, n_bytes, ctypes.sizeof(xtf_header))
-
-
+})
+
+# XTFHeaderType and packet class of each HeaderType byte, indexed directly by the HeaderType of the packet
+# Values that are not in XTFHeaderType map to (XTFHeaderType.unknown, XTFUnknownPacket)
+_XTF_HEADER_TYPE_TABLE = [XTFHeaderType.unknown] * 256
+for _header_type in XTFHeaderType:
+    if _header_type.value < 256:
+        _XTF_HEADER_TYPE_TABLE[_header_type.value] = _header_type
+_XTF_HEADER_TYPE_TABLE = tuple(_XTF_HEADER_TYPE_TABLE)
+_XTF_PACKET_CLASS_TABLE = tuple(XTFPacketClasses.get(header_type, XTFUnknownPacket) for header_type in _XTF_HEADER_TYPE_TABLE)
+del _header_type
@@ -4,9 +4,9 @@ from itertools import repeat
 from os.path import splitext, isfile
 from typing import Tuple, Any, Dict, Union, Generator, Iterable
 from warnings import warn
-import ctypes
 
 from pyxtf.xtf_ctypes import *
+from pyxtf.xtf_ctypes import _XTF_HEADER_TYPE_TABLE, _XTF_PACKET_CLASS_TABLE
 
 
 def xtf_padding(size: int) -> int:
@@ -37,12 +37,68 @@ def xtf_idx_pos_iter(
     return merge(*xtf_idx_iters)
 
 
-def xtf_read_gen(path: str, types: List[XTFHeaderType] = None) -> Generator[
+def xtf_sample_shifts(file_header: XTFFileHeader, dtype_out) -> List[int]:
+    """
+    Calculates the conversion of the samples of each sonar channel to the output type (see xtf_convert_samples).
+    Integer samples are quantized to integer output types by keeping the most significant bits (right shift),
+    e.g. 16-bit samples are shifted by 9 bits for int8 output (the sign bit is not used).
+    :param file_header: The file header of the XTF file (used to determine the sample type of each sonar channel)
+    :param dtype_out: The output type of the samples
+    :return: The number of bits to shift the samples of each sonar channel (0 for floating point output)
+    """
+    dtype_out = np.dtype(dtype_out)
+    if dtype_out.kind not in 'fiu':
+        raise RuntimeError('Unsupported output type of the sonar samples ({}).'.format(dtype_out))
+
+    shifts = []
+    for i, sample_dtype in enumerate(file_header._sonar_dtype):
+        if dtype_out.kind == 'f' or sample_dtype is None:
+            # Unsupported sample formats raise when the ping is read
+            shifts.append(0)
+        elif np.dtype(sample_dtype).kind == 'f':
+            raise RuntimeError('Sonar channel {} has floating point samples, which can not be quantized to {}.'.format(
+                i, dtype_out))
+        else:
+            value_bits = np.iinfo(dtype_out).bits - (1 if dtype_out.kind == 'i' else 0)
+            shifts.append(max(np.iinfo(sample_dtype).bits - value_bits, 0))
+
+    return shifts
+
+
+def xtf_convert_samples(ping: XTFPingHeader, dtype_out, shifts: List[int]):
+    """
+    Converts the samples of each channel of a sonar ping to the output type in place (in one numpy call per channel).
+    :param ping: The sonar ping, the data is replaced by the converted samples
+    :param dtype_out: The output type of the samples
+    :param shifts: The number of bits to right shift the samples of each channel, see xtf_sample_shifts
+    """
+    ping.data = [
+        np.right_shift(samples, shift).astype(dtype_out) if shift else samples.astype(dtype_out, copy=False)
+        for samples, shift in zip(ping.data, shifts)
+    ]
+
+
+def _warn_unknown_packet(header_type: int):
+    """
+    Warns that a packet is returned as XTFUnknownPacket, either as the type is not known or not implemented.
+    :param header_type: HeaderType of the packet
+    """
+    p_headertype = _XTF_HEADER_TYPE_TABLE[header_type]
+    if p_headertype == XTFHeaderType.unknown:
+        warn('XTFHeaderType ({}) is not known. Returned as XTFUnknownPacket'.format(header_type))
+    else:
+        warn('XTFHeaderType ({}) has no implementation. Returned as XTFUnknownPacket.'.format(p_headertype.name))
+
+
+def xtf_read_gen(path: str, types: List[XTFHeaderType] = None, lazy_pings: bool = False, dtype_out=None) -> Generator[
     Union[XTFFileHeader, XTFPacket], None, None]:
     """
     Generator object which iterates over the XTF file, return first the file header and then subsequent packets
     :param path: The path to the XTF file
     :param types: Optional list of XTFHeaderTypes to keep. Default (None) returns all types. Can improve performance
+    :param lazy_pings: If true, pings are returned as XTFPingHeaderLazy (data parsed on first access)
+    :param dtype_out: Optional output type of the sonar samples (e.g. np.float32), default (None) keeps the stored type.
+                      Integer types quantize the samples, see xtf_sample_shifts. Note: Parses the data of lazy pings.
     :return: None
     """
     # Read index file if it exists
@@ -64,6 +120,9 @@ def xtf_read_gen(path: str, types: List[XTFHeaderType] = None) -> Generator[
         if n_channels > 6:
             raise NotImplementedError("Support for more than 6 channels not implemented.")
 
+        # Conversion of the samples of each sonar channel, calculated once from the file header
+        sample_shifts = xtf_sample_shifts(file_header, dtype_out) if dtype_out is not None else None
+
         # Return the file header before starting packet iteration
         yield file_header
 
@@ -75,23 +134,22 @@ def xtf_read_gen(path: str, types: List[XTFHeaderType] = None) -> Generator[
 
                 # Get the class associated with this header type (if any)
                 # How to read and construct each type is implemented in the class (default impl. in XTFBase.__new__)
-                p_class = XTFPacketClasses.get(p_headertype, XTFUnknownPacket)
+                # Packets of types that are not known are stored as XTFHeaderType.unknown (outside the table)
+                p_class = _XTF_PACKET_CLASS_TABLE[p_headertype] if p_headertype < 256 else XTFUnknownPacket
+                if lazy_pings and p_class is XTFPingHeader:
+                    p_class = XTFPingHeaderLazy
                 p_header = p_class.create_from_buffer(buffer=f, file_header=file_header)
 
                 # Warn on unknown packets
                 if p_class is XTFUnknownPacket:
-                    try:
-                        p_headertype = XTFHeaderType(p_header.HeaderType)
-                        warning_str = 'XTFHeaderType ({}) has no implementation. Returned as XTFUnknownPacket.'.format(p_headertype.name)
-                        warn(warning_str)
-                    except ValueError:
-                        warning_str = 'XTFHeaderType ({}) is not known. Returned as XTFUnknownPacket'.format(p_header.HeaderType)
-                        warn(warning_str)
+                    _warn_unknown_packet(p_header.HeaderType)
+                elif sample_shifts is not None and p_headertype == XTFHeaderType.sonar:
+                    xtf_convert_samples(p_header, dtype_out, sample_shifts)
 
                 yield p_header
         else:
-            # Preallocate, as it is assigned to at every iteration
-            p_start = XTFPacketStart()
+            # Reuse the scratch instance, as it is assigned to at every iteration
+            p_start = XTFPacketStart.get_scratch()
 
             while True:
                 # Test for file end without advancing the file position
@@ -103,36 +161,37 @@ def xtf_read_gen(path: str, types: List[XTFHeaderType] = None) -> Generator[
 
                 # Read the first few shared packet bytes without advancing file pointer
                 bytes_read = f.readinto(p_start)
-                if bytes_read < ctypes.sizeof(XTFPacketStart):
+                if bytes_read < XTFPacketStart._SIZE:
                     raise RuntimeError('XTF file shorter than expected while reading packet.')
 
+                # Copy out the fields, the scratch instance may be overwritten while the packet is yielded
+                header_type = p_start.HeaderType
+                n_bytes_record = p_start.NumBytesThisRecord
+
                 # Only return packets that matches types arg (if None, return all)
-                try:
-                    p_headertype = XTFHeaderType(p_start.HeaderType)
-                except ValueError:
-                    p_headertype = XTFHeaderType.unknown
+                p_headertype = _XTF_HEADER_TYPE_TABLE[header_type]
 
                 if not types or p_headertype in types:
                     f.seek(packet_start_loc)
 
                     # Get the class associated with this header type (if any), else use XTFUnknownPacket
                     # How to read and construct each type is implemented in the class (default impl. in XTFBase.__new__)
-                    p_class = XTFPacketClasses.get(p_headertype, XTFUnknownPacket)
+                    p_class = _XTF_PACKET_CLASS_TABLE[header_type]
 
                     # Warn on unknown packets or missing implementations
-                    if p_headertype == XTFHeaderType.unknown:
-                        warning_str = 'XTFHeaderType ({}) is not known. Returned as XTFUnknownPacket'.format(p_start.HeaderType)
-                        warn(warning_str)
-                    elif p_class is XTFUnknownPacket:
-                        warning_str = 'XTFHeaderType ({}) has no implementation. Returned as XTFUnknownPacket.'.format(p_headertype.name)
-                        warn(warning_str)
+                    if p_class is XTFUnknownPacket:
+                        _warn_unknown_packet(header_type)
+                    elif lazy_pings and p_class is XTFPingHeader:
+                        p_class = XTFPingHeaderLazy
 
                     p_header = p_class.create_from_buffer(buffer=f, file_header=file_header)
+                    if sample_shifts is not None and p_headertype == XTFHeaderType.sonar:
+                        xtf_convert_samples(p_header, dtype_out, sample_shifts)
 
                     yield p_header
 
                 # Skip over any data padding before next iteration
-                f.seek(packet_start_loc + p_start.NumBytesThisRecord)
+                f.seek(packet_start_loc + n_bytes_record)
 
                 # Store index file information
                 try:
@@ -147,24 +206,24 @@ def xtf_read_gen(path: str, types: List[XTFHeaderType] = None) -> Generator[
         return
 
 
-def xtf_read(path: str, types: List[XTFHeaderType] = None) -> Tuple[XTFFileHeader, Dict[XTFHeaderType, List[Any]]]:
+def xtf_read(path: str, types: List[XTFHeaderType] = None, lazy_pings: bool = False,
+             dtype_out=None) -> Tuple[XTFFileHeader, Dict[XTFHeaderType, List[Any]]]:
     """
     Wrapper around the read generator object, which sorts the packet types into a dictionary
     :param path: The path of the XTF file
     :param types: Optional list of XTFHeaderTypes to keep. Default (None) returns all types. Can improve performance
+    :param lazy_pings: If true, pings are returned as XTFPingHeaderLazy (data parsed on first access)
+    :param dtype_out: Optional output type of the sonar samples (e.g. np.float32), see xtf_read_gen
     :return:
     """
     # Intialize generator and read file header (first item)
-    gen = xtf_read_gen(path, types)
+    gen = xtf_read_gen(path, types, lazy_pings, dtype_out)
     file_header = next(gen)
 
     # Loop through XTF packets, sort into dict
     packets = {}  # type: Dict[XTFHeaderType, List[Any]]
     for packet in gen:
-        try:
-            p_headertype = XTFHeaderType(packet.HeaderType)
-        except ValueError:
-            p_headertype = XTFHeaderType.unknown
+        p_headertype = _XTF_HEADER_TYPE_TABLE[packet.HeaderType]
         try:
             packets[p_headertype].append(packet)
         except KeyError:
@@ -187,7 +246,8 @@ def concatenate_channel(
     :return: The sonar image as a dense numpy array
     """
     # Sort pings by time
-    pings.sort(key=XTFPingHeader.get_time)
+    ping_order = np.argsort(XTFPingHeader.get_times_bulk(pings), kind='stable')
+    pings[:] = [pings[i] for i in ping_order]
 
     # find array of largest size
     sizes = [ping.data[channel].shape[0] for ping in pings]
@@ -1,5 +1,5 @@
 from os import path
-from setuptools import setup
+from setuptools import setup, Extension
 from tools.generate_pyi import generate_pyi
 
 
@@ -15,6 +15,18 @@ def main():
     with open(path.join(this_directory, 'README.md'), encoding='utf-8') as f:
         long_description = f.read()
 
+    # Build the optional compiled parsing routines if Cython is available (pure python fallback otherwise)
+    try:
+        from Cython.Build import cythonize
+        ext_modules = cythonize([Extension('pyxtf._fastparse', ['pyxtf/_fastparse.pyx'])])
+
+        # Skip the extension with a warning if it fails to build (e.g. no C compiler)
+        # Note: Set after cythonize, which does not carry over the optional flag to the extensions it returns
+        for ext in ext_modules:
+            ext.optional = True
+    except ImportError:
+        ext_modules = []
+
     # Run setup script
     setup(name='pyxtf',
           version='1.2',
@@ -25,9 +37,11 @@ def main():
           author_email='oysstu@gmail.com',
           url='https://github.com/oysstu/pyxtf',
           license='MIT',
-          setup_requires=['numpy>=1.11'],
-          install_requires=['numpy>=1.11', 'matplotlib>=1.5.1'],
+          setup_requires=['numpy>=1.20'],
+          install_requires=['numpy>=1.20', 'matplotlib>=1.5.1'],
+          extras_require={'jit': ['numba']},
           packages=['pyxtf', 'pyxtf.vendors'],
+          ext_modules=ext_modules,
           package_data={'': ['*.pyi']},
           use_2to3=False,
           classifiers=[
@@ -0,0 +1,132 @@
+import ctypes
+
+import numpy as np
+import pytest
+
+from pyxtf import xtf_ctypes
+from pyxtf.xtf_ctypes import *
+
+
+# Number of pings (and of each of the other packet types) in the test file
+N_PINGS = 20
+
+
+def make_file_header() -> XTFFileHeader:
+    fh = XTFFileHeader()
+    fh.NumberOfSonarChannels = 2
+    fh.NumberOfBathymetryChannels = 1
+    fh.ChanInfo[0].TypeOfChannel = XTFChannelType.port.value
+    fh.ChanInfo[0].BytesPerSample = 2
+    fh.ChanInfo[1].TypeOfChannel = XTFChannelType.stbd.value
+    fh.ChanInfo[1].BytesPerSample = 2
+    fh.ChanInfo[2].TypeOfChannel = XTFChannelType.bathy.value
+    return fh
+
+
+def make_xtf(n_pings: int = N_PINGS) -> bytes:
+    """
+    Creates the contents of a small XTF file with sonar, bathymetry, gyro, navigation, raw navigation, attitude and
+    unknown packets.
+    Some packets are padded, and the sonar samples contain the magic number to trip up scans that search for it.
+    """
+    rng = np.random.default_rng(0)
+    out = bytearray(bytes(make_file_header()))
+
+    for i in range(n_pings):
+        p = XTFPingHeader()
+        p.HeaderType = XTFHeaderType.sonar.value
+        p.NumChansToFollow = 2
+        p.Year, p.Month, p.Day, p.Hour, p.Minute, p.Second = 2020, 1 + i % 12, 28, 3, 4, 5
+        p.PingNumber = i
+        chans = b''
+        for c in range(2):
+            ch = XTFPingChanHeader()
+            ch.ChannelNumber = c
+            ch.NumSamples = 10 + i
+            samples = rng.integers(0, 60000, ch.NumSamples, dtype=np.uint16)
+            samples[::7] = 0xFACE
+            chans += bytes(ch) + samples.tobytes()
+        padding = b'\0' * (i % 3)
+        p.NumBytesThisRecord = p._SIZE + len(chans) + len(padding)
+        out += bytes(p) + chans + padding
+
+        b = XTFPingHeader()
+        b.HeaderType = XTFHeaderType.bathy_xyza.value
+        b.PingNumber = i
+        beams = (XTFBeamXYZA * 5)()
+        for k in range(5):
+            beams[k].fDepth = k + i
+            beams[k].ucQuality = k
+        b.NumBytesThisRecord = b._SIZE + ctypes.sizeof(beams)
+        out += bytes(b) + bytes(beams)
+
+        g = XTFHeaderGyro()
+        g.NumBytesThisRecord = g._SIZE
+        g.Year, g.Month, g.Day, g.Hour, g.Minute, g.Second, g.Microsecond = 2018, 5, 6, 7, 8, 9, 1000 * i
+        g.SourceEpoch = 1500000000 + i if i % 2 else 0
+        g.Gyro = i * 3.0
+        out += bytes(g)
+
+        n = XTFHeaderNavigation()
+        n.NumBytesThisRecord = n._SIZE
+        n.Year, n.Month, n.Day = 2019, 3, 1
+        n.RawXcoordinate = i * 2.0
+        out += bytes(n)
+
+        r = XTFPosRawNavigation()
+        r.NumBytesThisRecord = r._SIZE
+        r.Year, r.Month, r.Day, r.Microsecond = 2017, 7, 7, 5
+        r.RawXcoordinate = i
+        out += bytes(r)
+
+        a = XTFAttitudeData()
+        a.NumBytesThisRecord = a._SIZE
+        a.Year, a.Month, a.Day = 2020, 9, 13
+        a.Pitch = i * 0.1
+        out += bytes(a)
+
+        u = XTFPacketStart()
+        u.HeaderType = 200
+        data = b'\x01\x02\x03' * i
+        u.NumBytesThisRecord = u._SIZE + len(data)
+        out += bytes(u) + data
+
+    return bytes(out)
+
+
+@pytest.fixture(scope='session')
+def xtf_bytes() -> bytes:
+    return make_xtf()
+
+
+@pytest.fixture
+def xtf_path(tmp_path, xtf_bytes) -> str:
+    """
+    Path of the test file written to a temporary directory (the index file written by the reader is kept there).
+    """
+    path = tmp_path / 'test.xtf'
+    path.write_bytes(xtf_bytes)
+    return str(path)
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    """
+    Disables the compiled (Cython and Numba) versions of the scanning and parsing routines.
+    """
+    monkeypatch.setattr(xtf_ctypes, '_scan_packets_compiled', None)
+    monkeypatch.setattr(xtf_ctypes, '_parse_gyro', None)
+    monkeypatch.setattr(xtf_ctypes, '_parse_sonar_channels', xtf_ctypes._parse_sonar_channels_py)
+    monkeypatch.setattr(xtf_ctypes, '_JIT_FUNCTIONS', {'scan_packets': None, 'extract_gyro': None})
+
+
+@pytest.fixture
+def numba_only(monkeypatch):
+    """
+    Uses the Numba versions of the compiled routines, even if the Cython extension has been built.
+    """
+    pytest.importorskip('numba')
+    monkeypatch.setattr(xtf_ctypes, '_scan_packets_compiled', None)
+    monkeypatch.setattr(xtf_ctypes, '_JIT_FUNCTIONS', {})
+
+
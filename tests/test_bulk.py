@@ -0,0 +1,194 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from pyxtf import *
+from pyxtf import xtf_ctypes
+
+
+def _assert_records_equal(records, packets):
+    assert isinstance(records, np.recarray) and records.shape == (len(packets),)
+    for record, packet in zip(records, packets):
+        for field_name, _ in type(packet)._all_fields:
+            assert np.array_equal(record[field_name], np.asarray(getattr(packet, field_name))), field_name
+
+
+def _packet_run(p_class, n_packets: int, padding: int = 0):
+    packets = []
+    for i in range(n_packets):
+        p = p_class()
+        p.NumBytesThisRecord = p._SIZE + padding
+        p.Year, p.Month, p.Day, p.Hour = 2020, 9, 13, i
+        if p_class is XTFPosRawNavigation:
+            p.RawYcoordinate = 0.5 * i
+        else:
+            p.Pitch = 0.5 * i
+        packets.append(p)
+    return packets, b''.join(bytes(p) + b'\xff' * padding for p in packets)
+
+
+@pytest.mark.parametrize('p_class', [XTFAttitudeData, XTFPosRawNavigation])
+@pytest.mark.parametrize('padding', [0, 6])
+def test_bulk_read(p_class, padding):
+    packets, run = _packet_run(p_class, 5, padding)
+    _assert_records_equal(p_class.bulk_read(run), packets)
+
+    # Reads count packets from the current position of a stream and leaves it at the end of the run
+    buffer = BytesIO(b'\0' * 3 + run)
+    buffer.seek(3)
+    _assert_records_equal(p_class.bulk_read(buffer, count=2), packets[:2])
+    assert buffer.tell() == 3 + 2 * (p_class._SIZE + padding)
+
+
+@pytest.mark.parametrize('p_class', [XTFAttitudeData, XTFPosRawNavigation])
+def test_bulk_read_errors(p_class):
+    packets, run = _packet_run(p_class, 3)
+    with pytest.raises(RuntimeError, match='shorter than expected'):
+        p_class.bulk_read(run, count=4)
+
+    # All packets in the run must have the same type and size
+    other = XTFHeaderGyro()
+    other.NumBytesThisRecord = other._SIZE
+    with pytest.raises(RuntimeError, match='run of'):
+        p_class.bulk_read(run + bytes(other))
+
+    corrupt = bytearray(run)
+    corrupt[p_class._SIZE] = 0
+    with pytest.raises(RuntimeError, match='0xFACE'):
+        p_class.bulk_read(bytes(corrupt))
+
+
+def test_from_buffer_bulk():
+    beams = (XTFBeamXYZA * 4)()
+    for k in range(4):
+        beams[k].dPosOffsetTrX = k * 0.5
+        beams[k].fDepth = k + 1
+        beams[k].ucQuality = k
+    beam_bytes = bytearray(b'\0' * 3 + bytes(beams))
+    packets = [XTFBeamXYZA.create_from_buffer(BytesIO(bytes(beam))) for beam in beams]
+
+    _assert_records_equal(XTFBeamXYZA.from_buffer_bulk(bytes(beams)), packets)
+    _assert_records_equal(XTFBeamXYZA.from_buffer_bulk(beam_bytes, count=2, offset=3 + XTFBeamXYZA._SIZE),
+                          packets[1:3])
+
+    # The records are a view of the buffer
+    records = XTFBeamXYZA.from_buffer_bulk(beam_bytes, offset=3)
+    records.fDepth[0] = -1.0
+    assert XTFBeamXYZA.create_from_buffer(BytesIO(bytes(beam_bytes[3:]))).fDepth == -1.0
+
+
+def _snippets(n_beams: int) -> bytes:
+    snp0 = SNP0()
+    snp0.HeaderSize = snp0._SIZE
+    snp0.PingNumber = 11
+    snp0.BeamCnt = n_beams
+    snippet_bytes = bytes(snp0)
+    for k in range(n_beams):
+        snp1 = SNP1()
+        # The second beam has a header with extra (unknown) bytes
+        snp1.HeaderSize = snp1._SIZE + (4 if k == 1 else 0)
+        snp1.DataSize = 2 * (k + 1)
+        snp1.Beam = k
+        snp1.SnipSamples = k + 1
+        snippet_bytes += bytes(snp1) + b'\xee' * (snp1.HeaderSize - snp1._SIZE)
+        snippet_bytes += np.arange(k + 1, dtype='<u2').tobytes()
+    return snippet_bytes
+
+
+def test_read_snippets():
+    snp0, beams, samples = SNP0.read_snippets(_snippets(3))
+    assert snp0.PingNumber == 11 and snp0.BeamCnt == 3
+    assert isinstance(beams, np.recarray) and beams.shape == (3,)
+    np.testing.assert_array_equal(beams.Beam, [0, 1, 2])
+    np.testing.assert_array_equal(beams.SnipSamples, [1, 2, 3])
+    assert len(samples) == 3
+    for k, beam_samples in enumerate(samples):
+        assert beam_samples.dtype == np.dtype('<u2')
+        np.testing.assert_array_equal(beam_samples, np.arange(k + 1))
+
+    snp0, beams, samples = SNP0.read_snippets(_snippets(0))
+    assert beams.shape == (0,) and samples == []
+
+
+def test_read_snippets_errors():
+    snippet_bytes = _snippets(3)
+    with pytest.raises(RuntimeError, match='end hit while reading SNP0'):
+        SNP0.read_snippets(snippet_bytes[:SNP0._SIZE - 1])
+    with pytest.raises(RuntimeError, match='end hit while reading SNP1'):
+        SNP0.read_snippets(snippet_bytes[:SNP0._SIZE + SNP1._SIZE - 1])
+    with pytest.raises(RuntimeError, match='exceeds the number of bytes remaining'):
+        SNP0.read_snippets(snippet_bytes[:-1])
+
+    corrupt = bytearray(snippet_bytes)
+    corrupt[SNP0._SIZE] = 0
+    with pytest.raises(RuntimeError, match='0x534E5031'):
+        SNP0.read_snippets(corrupt)
+    with pytest.raises(RuntimeError, match='0x534E5030'):
+        SNP0.read_snippets(snippet_bytes[1:])
+
+
+def _packet_offsets(xtf_bytes: bytes, header_type: XTFHeaderType) -> np.ndarray:
+    offsets, header_types, _ = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    return offsets[header_types == header_type.value]
+
+
+@pytest.mark.parametrize('p_class', [XTFHeaderGyro, XTFHeaderNavigation, XTFAttitudeData])
+def test_from_offsets(xtf_bytes, pure_python, p_class):
+    offsets = _packet_offsets(xtf_bytes, XTFHeaderType(p_class._DEFAULT_HEADER_TYPE))
+    packets = [p_class.create_from_buffer(BytesIO(xtf_bytes[offset:])) for offset in offsets]
+    _assert_records_equal(p_class.from_offsets(xtf_bytes, offsets), packets)
+    _assert_records_equal(p_class.from_offsets(memoryview(xtf_bytes), offsets[::-2]), packets[::-2])
+
+    assert p_class.from_offsets(xtf_bytes, []).shape == (0,)
+
+
+def test_from_offsets_cython(xtf_bytes, monkeypatch):
+    fastparse = pytest.importorskip('pyxtf._fastparse')
+    assert xtf_ctypes._parse_gyro is fastparse.parse_gyro
+
+    offsets = _packet_offsets(xtf_bytes, XTFHeaderType.gyro)
+    compiled = XTFHeaderGyro.from_offsets(xtf_bytes, offsets)
+    monkeypatch.setattr(xtf_ctypes, '_parse_gyro', None)
+    records = XTFHeaderGyro.from_offsets(xtf_bytes, offsets)
+    assert compiled.dtype == records.dtype
+    assert compiled.tobytes() == records.tobytes()
+
+    # The compiled parser raises the same errors as the numpy version
+    corrupt = bytearray(xtf_bytes)
+    corrupt[offsets[1]] = 0
+    for parse_gyro in (fastparse.parse_gyro, None):
+        monkeypatch.setattr(xtf_ctypes, '_parse_gyro', parse_gyro)
+        with pytest.raises(RuntimeError, match='0xFACE'):
+            XTFHeaderGyro.from_offsets(bytes(corrupt), offsets)
+        with pytest.raises(RuntimeError, match='shorter than expected'):
+            XTFHeaderGyro.from_offsets(xtf_bytes, [len(xtf_bytes) - 10])
+
+
+def _check_gyro_extract(xtf_bytes: bytes):
+    offsets = _packet_offsets(xtf_bytes, XTFHeaderType.gyro)
+    times, gyro = XTFHeaderGyro.extract(xtf_bytes, offsets)
+
+    packets = [XTFHeaderGyro.create_from_buffer(BytesIO(xtf_bytes[offset:])) for offset in offsets]
+    assert times.dtype == np.dtype('datetime64[us]') and gyro.dtype == np.float32
+    np.testing.assert_array_equal(times, [np.datetime64(p.get_time(), 'us') for p in packets])
+    np.testing.assert_array_equal(gyro, np.array([p.Gyro for p in packets], dtype=np.float32))
+
+    times, gyro = XTFHeaderGyro.extract(xtf_bytes, np.array([], dtype=np.int64))
+    assert times.shape == gyro.shape == (0,)
+
+    corrupt = bytearray(xtf_bytes)
+    corrupt[offsets[1]] = 0
+    with pytest.raises(RuntimeError, match='0xFACE'):
+        XTFHeaderGyro.extract(bytes(corrupt), offsets)
+    with pytest.raises(RuntimeError, match='shorter than expected'):
+        XTFHeaderGyro.extract(xtf_bytes, [len(xtf_bytes) - 10])
+
+
+def test_gyro_extract_pure_python(xtf_bytes, pure_python):
+    _check_gyro_extract(xtf_bytes)
+
+
+def test_gyro_extract_numba(xtf_bytes, numba_only):
+    _check_gyro_extract(xtf_bytes)
+    assert xtf_ctypes._JIT_FUNCTIONS['extract_gyro'] is not None
@@ -0,0 +1,28 @@
+import ctypes
+
+import pytest
+
+from pyxtf.xtf_ctypes import *
+
+
+# Sizes given in the XTF format document
+@pytest.mark.parametrize('xtf_struct, n_bytes', [
+    (XTFFileHeader, 1024),
+    (XTFChanInfo, 128),
+    (XTFAttitudeData, 64),
+    (XTFNotesHeader, 256),
+    (XTFRawSerialHeader, 30),
+    (XTFPingHeader, 256),
+    (XTFPingChanHeader, 64),
+    (XTFHighSpeedSensor, 64),
+    (XTFBeamXYZA, 31),
+    (XTFHeaderGyro, 64),
+    (XTFHeaderNavigation, 64),
+    (XTFPosRawNavigation, 64),
+    (SNP0, 74),
+    (SNP1, 24)
+])
+def test_struct_size(xtf_struct, n_bytes):
+    assert ctypes.sizeof(xtf_struct) == n_bytes
+    assert xtf_struct._SIZE == n_bytes
+    assert xtf_struct._np_dtype.itemsize == n_bytes
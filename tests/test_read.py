@@ -0,0 +1,224 @@
+import mmap
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+import pyxtf
+from pyxtf.xtf_io import xtf_sample_shifts
+from pyxtf import xtf_ctypes
+from pyxtf.xtf_ctypes import *
+
+from conftest import N_PINGS
+
+
+def _read(xtf_path, **kwargs):
+    with pytest.warns(UserWarning, match='Returned as XTFUnknownPacket'):
+        return pyxtf.xtf_read(xtf_path, **kwargs)
+
+
+@pytest.mark.parametrize('lazy_pings', [False, True])
+def test_bathy_writable(xtf_path, lazy_pings):
+    _, packets = _read(xtf_path, lazy_pings=lazy_pings)
+    bathy = packets[XTFHeaderType.bathy_xyza]
+    assert len(bathy) == N_PINGS
+
+    for i, ping in enumerate(bathy):
+        np.testing.assert_array_equal(ping.data.fDepth, np.arange(5) + i)
+        ping.data[0].fDepth = -1.0
+        ping.data.ucQuality[1] = 10
+        assert ping.data.fDepth[0] == -1.0 and ping.data[1].ucQuality == 10
+
+
+@pytest.mark.parametrize('access', [mmap.ACCESS_READ, mmap.ACCESS_COPY])
+def test_bathy_from_mmap_writable(xtf_bytes, xtf_path, access):
+    offsets, header_types, _ = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    fh = XTFFileHeader.create_from_buffer(xtf_bytes)
+    with open(xtf_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=access)
+        ping = XTFPingHeader.from_mmap(mm, int(offsets[header_types == XTFHeaderType.bathy_xyza][0]), fh)
+        ping.data[0].fDepth = -1.0
+        assert ping.data.fDepth[0] == -1.0
+
+        # Writable maps are viewed, read-only maps are copied
+        assert np.shares_memory(ping.data, np.frombuffer(mm, dtype=np.uint8)) == (access == mmap.ACCESS_COPY)
+        del ping
+        mm.close()
+
+
+def _reson_7018_ping(n_bytes_data: int = 10) -> bytes:
+    p = XTFPingHeader()
+    p.HeaderType = XTFHeaderType.reson_7018_watercolumn.value
+    p.NumChansToFollow = 1
+    ch = XTFPingChanHeader()
+    ch.ChannelNumber = 3
+    ch.SlantRange = 42.0
+    p.NumBytesThisRecord = p._SIZE + ch._SIZE + n_bytes_data
+    return bytes(p) + bytes(ch) + bytes(range(n_bytes_data))
+
+
+@pytest.mark.parametrize('p_class', [XTFPingHeader, XTFPingHeaderLazy])
+def test_reson_7018_chan_headers_writable(p_class):
+    ping = p_class.create_from_buffer(_reson_7018_ping(), file_header=XTFFileHeader())
+
+    assert ping.ping_chan_headers.shape == (1,)
+    assert ping.ping_chan_headers[0].ChannelNumber == 3 and ping.ping_chan_headers[0].SlantRange == 42.0
+    assert bytes(ping.data) == bytes(range(10))
+    ping.ping_chan_headers[0].SlantRange = 10.0
+    assert ping.ping_chan_headers.SlantRange[0] == 10.0
+
+
+@pytest.mark.parametrize('header_type, n_bytes_record', [
+    (XTFHeaderType.sonar, XTFPingHeader._SIZE - 1),
+    (XTFHeaderType.bathy_xyza, 0),
+    (XTFHeaderType.reson_7018_watercolumn, XTFPingHeader._SIZE + XTFPingChanHeader._SIZE - 1),
+    (XTFHeaderType.multibeam_raw_beam_angle, 100)
+])
+def test_ping_record_too_short(header_type, n_bytes_record):
+    # A NumBytesThisRecord smaller than the headers must not read the remainder of the file as the ping data
+    p = XTFPingHeader()
+    p.HeaderType = header_type.value
+    p.NumBytesThisRecord = n_bytes_record
+    with pytest.raises(RuntimeError, match='shorter than expected'):
+        XTFPingHeader.create_from_buffer(bytes(p) + bytes(1000), file_header=XTFFileHeader())
+
+
+def _check_sonar(packets):
+    pings = packets[XTFHeaderType.sonar]
+    assert len(pings) == N_PINGS
+    for i, ping in enumerate(pings):
+        assert ping.PingNumber == i
+        assert ping.ping_chan_headers.shape == (2,)
+        np.testing.assert_array_equal(ping.ping_chan_headers.ChannelNumber, [0, 1])
+        assert len(ping.data) == 2
+        for data in ping.data:
+            assert data.dtype == np.uint16 and data.shape == (10 + i,)
+            np.testing.assert_array_equal(data[::7], 0xFACE)
+
+
+@pytest.mark.parametrize('lazy_pings', [False, True])
+def test_read_sonar(xtf_path, lazy_pings):
+    _, packets = _read(xtf_path, lazy_pings=lazy_pings)
+    _check_sonar(packets)
+
+
+@pytest.mark.parametrize('lazy_pings', [False, True])
+def test_read_sonar_pure_python(xtf_path, pure_python, lazy_pings):
+    _, packets = _read(xtf_path, lazy_pings=lazy_pings)
+    _check_sonar(packets)
+
+
+def test_sonar_channels_cython(xtf_bytes):
+    fastparse = pytest.importorskip('pyxtf._fastparse')
+    assert xtf_ctypes._parse_sonar_channels is fastparse.parse_sonar_channels
+
+    fh = XTFFileHeader.create_from_buffer(xtf_bytes)
+    offsets, header_types, sizes = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    is_sonar = header_types == XTFHeaderType.sonar.value
+    for offset, size in zip(offsets[is_sonar], sizes[is_sonar]):
+        packet_bytes = memoryview(xtf_bytes)[offset + XTFPingHeader._SIZE:offset + size]
+        args = (packet_bytes, 2, len(packet_bytes), fh._sonar_bps, fh._sonar_reserved,
+                XTFPingChanHeader._np_record_dtype)
+        chan_headers, sample_slices = fastparse.parse_sonar_channels(*args)
+        chan_headers_py, sample_slices_py = xtf_ctypes._parse_sonar_channels_py(*args)
+
+        assert chan_headers.dtype == chan_headers_py.dtype
+        assert chan_headers.tobytes() == chan_headers_py.tobytes()
+        assert list(sample_slices) == list(sample_slices_py)
+
+    # The compiled parser raises the same errors as the python version
+    packet_bytes = memoryview(xtf_bytes)[offsets[0] + XTFPingHeader._SIZE:offsets[0] + sizes[0]]
+    for parse in (fastparse.parse_sonar_channels, xtf_ctypes._parse_sonar_channels_py):
+        with pytest.raises(RuntimeError, match='shorter than expected'):
+            parse(packet_bytes[:100], 2, 100, fh._sonar_bps, fh._sonar_reserved, XTFPingChanHeader._np_record_dtype)
+
+
+@pytest.mark.parametrize('access', [mmap.ACCESS_READ, mmap.ACCESS_COPY])
+def test_sonar_from_mmap(xtf_bytes, xtf_path, access):
+    offsets, header_types, _ = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    sonar_offsets = offsets[header_types == XTFHeaderType.sonar.value]
+    fh = XTFFileHeader.create_from_buffer(xtf_bytes)
+    with open(xtf_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=access)
+        mm_array = np.frombuffer(mm, dtype=np.uint8)
+        pings = [XTFPingHeader.from_mmap(mm, int(offset), fh) for offset in sonar_offsets]
+        _check_sonar({XTFHeaderType.sonar: pings})
+
+        # The samples are always views, the header fields only if the map is writable
+        assert all(np.shares_memory(data, mm_array) for ping in pings for data in ping.data)
+        pings[0].PingNumber = 1000
+        ping_number = XTFPingHeader.unpack_tuple(mm, int(sonar_offsets[0]))[XTFPingHeader._FIELD_INDEX['PingNumber']]
+        assert ping_number == (1000 if access == mmap.ACCESS_COPY else 0)
+
+        del pings, mm_array
+        mm.close()
+
+
+def test_view_from_buffer(xtf_bytes):
+    offsets, header_types, sizes = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    offset = int(offsets[header_types == XTFHeaderType.sonar.value][1])
+    size = int(sizes[header_types == XTFHeaderType.sonar.value][1])
+    packet_bytes = bytearray(xtf_bytes[offset:offset + size])
+    fh = XTFFileHeader.create_from_buffer(xtf_bytes)
+
+    ping = XTFPingHeader.view_from_buffer(packet_bytes, fh)
+    assert ping.PingNumber == 1
+    ping.PingNumber = 5
+    ping.data[0][1] = 123
+    assert XTFPingHeader.create_from_buffer(bytes(packet_bytes), fh).PingNumber == 5
+    assert XTFPingHeader.create_from_buffer(bytes(packet_bytes), fh).data[0][1] == 123
+
+    with pytest.raises(RuntimeError, match='not a stream'):
+        XTFPingHeader.view_from_buffer(BytesIO(packet_bytes), fh)
+
+
+def test_lazy_pings(xtf_path):
+    _, packets = _read(xtf_path)
+    _, packets_lazy = _read(xtf_path, lazy_pings=True)
+
+    for ping, ping_lazy in zip(packets[XTFHeaderType.sonar], packets_lazy[XTFHeaderType.sonar]):
+        assert type(ping) is XTFPingHeader and type(ping_lazy) is XTFPingHeaderLazy
+        assert bytes(ping) == bytes(ping_lazy)
+
+        # The header fields are available without parsing the payload
+        assert ping_lazy.PingNumber == ping.PingNumber and ping_lazy._payload is not None
+        assert ping_lazy.ping_chan_headers.tobytes() == ping.ping_chan_headers.tobytes()
+        assert ping_lazy._payload is None
+        for data, data_lazy in zip(ping.data, ping_lazy.data):
+            np.testing.assert_array_equal(data, data_lazy)
+
+    for ping, ping_lazy in zip(packets[XTFHeaderType.bathy_xyza], packets_lazy[XTFHeaderType.bathy_xyza]):
+        assert type(ping_lazy) is XTFPingHeaderLazy
+        assert ping_lazy.data.tobytes() == ping.data.tobytes()
+
+    _check_sonar(packets_lazy)
+
+
+def test_lazy_ping_record_too_short():
+    p = XTFPingHeader()
+    p.NumBytesThisRecord = XTFPingHeader._SIZE - 1
+    with pytest.raises(RuntimeError, match='shorter than expected'):
+        XTFPingHeaderLazy.create_from_buffer(bytes(p) + bytes(1000), file_header=XTFFileHeader())
+    with pytest.raises(RuntimeError, match='requires file_header'):
+        XTFPingHeaderLazy.create_from_buffer(bytes(p))
+
+
+@pytest.mark.parametrize('lazy_pings', [False, True])
+@pytest.mark.parametrize('dtype_out, shift', [(np.float32, 0), (np.int8, 9), (np.uint8, 8), (np.int32, 0)])
+def test_dtype_out(xtf_path, lazy_pings, dtype_out, shift):
+    fh, packets = _read(xtf_path)
+    assert xtf_sample_shifts(fh, dtype_out)[:2] == [shift, shift]
+
+    _, packets_out = _read(xtf_path, lazy_pings=lazy_pings, dtype_out=dtype_out)
+    for ping, ping_out in zip(packets[XTFHeaderType.sonar], packets_out[XTFHeaderType.sonar]):
+        for data, data_out in zip(ping.data, ping_out.data):
+            assert data_out.dtype == dtype_out
+            np.testing.assert_array_equal(data_out, (data >> shift).astype(dtype_out))
+
+    # Only the sonar samples are converted
+    assert packets_out[XTFHeaderType.bathy_xyza][0].data.dtype == XTFBeamXYZA._np_record_dtype
+
+
+def test_dtype_out_unsupported(xtf_path):
+    with pytest.raises(RuntimeError, match='Unsupported output type'):
+        pyxtf.xtf_read(xtf_path, dtype_out=np.bool_)
@@ -0,0 +1,114 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from pyxtf import xtf_ctypes
+from pyxtf.xtf_ctypes import *
+
+
+def _reference_offsets(xtf_bytes: bytes) -> np.ndarray:
+    # Follows NumBytesThisRecord by constructing each packet start
+    offsets = []
+    offset = XTFFileHeader._SIZE
+    while offset < len(xtf_bytes):
+        offsets.append(offset)
+        offset += XTFPacketStart.create_from_buffer(BytesIO(xtf_bytes[offset:])).NumBytesThisRecord
+    return np.array(offsets, dtype=np.int64)
+
+
+def _corrupt(xtf_bytes: bytes, pos: int, value: int = 0) -> bytes:
+    corrupt = bytearray(xtf_bytes)
+    corrupt[pos] = value
+    return bytes(corrupt)
+
+
+def _zero_n_bytes(xtf_bytes: bytes, offset: int) -> bytes:
+    n_bytes_field = offset + XTFPacketStart._n_bytes_field_offsets()[xtf_bytes[offset + 2]]
+    corrupt = bytearray(xtf_bytes)
+    corrupt[n_bytes_field:n_bytes_field + 4] = bytes(4)
+    return bytes(corrupt)
+
+
+def test_scan_offsets(xtf_bytes):
+    offsets = XTFPacketStart.scan_offsets(xtf_bytes, XTFFileHeader._SIZE)
+    assert offsets.dtype == np.int64
+    np.testing.assert_array_equal(offsets, _reference_offsets(xtf_bytes))
+
+    # Any object supporting the buffer protocol
+    np.testing.assert_array_equal(XTFPacketStart.scan_offsets(bytearray(xtf_bytes), XTFFileHeader._SIZE), offsets)
+    np.testing.assert_array_equal(XTFPacketStart.scan_offsets(memoryview(xtf_bytes), XTFFileHeader._SIZE), offsets)
+
+
+def test_scan_offsets_errors(xtf_bytes):
+    offsets = XTFPacketStart.scan_offsets(xtf_bytes, XTFFileHeader._SIZE)
+    with pytest.raises(RuntimeError, match='offset {} does not start'.format(offsets[3])):
+        XTFPacketStart.scan_offsets(_corrupt(xtf_bytes, offsets[3]), XTFFileHeader._SIZE)
+
+    with pytest.raises(RuntimeError, match='offset {} has NumBytesThisRecord = 0'.format(offsets[5])):
+        XTFPacketStart.scan_offsets(_zero_n_bytes(xtf_bytes, offsets[5]), XTFFileHeader._SIZE)
+
+
+def test_scan_offsets_empty():
+    assert XTFPacketStart.scan_offsets(bytes(XTFFileHeader()), XTFFileHeader._SIZE).shape == (0,)
+
+
+# The first ping has one packet of each type, followed by more packets of each type (including sonar data with 0xFACE)
+@pytest.mark.parametrize('i_packet', range(7))
+@pytest.mark.parametrize('corrupt_field', ['MagicNumber', 'NumBytesThisRecord'])
+def test_scan_offsets_resync(xtf_bytes, i_packet, corrupt_field):
+    offsets = XTFPacketStart.scan_offsets(xtf_bytes, XTFFileHeader._SIZE)
+    offset = offsets[i_packet]
+    corrupt = _corrupt(xtf_bytes, offset) if corrupt_field == 'MagicNumber' else _zero_n_bytes(xtf_bytes, offset)
+
+    with pytest.raises(RuntimeError):
+        XTFPacketStart.scan_offsets(corrupt, XTFFileHeader._SIZE)
+
+    with pytest.warns(UserWarning, match='Corrupt XTF packet at offset {}, skipped {} bytes'.format(
+            offset, offsets[i_packet + 1] - offset)):
+        resynced = XTFPacketStart.scan_offsets(corrupt, XTFFileHeader._SIZE, resync=True)
+    np.testing.assert_array_equal(resynced, np.delete(offsets, i_packet))
+
+
+def test_scan_offsets_resync_last_packet(xtf_bytes, recwarn):
+    offsets = XTFPacketStart.scan_offsets(xtf_bytes, XTFFileHeader._SIZE)
+    np.testing.assert_array_equal(XTFPacketStart.scan_offsets(xtf_bytes, XTFFileHeader._SIZE, resync=True), offsets)
+    assert len(recwarn) == 0
+
+    with pytest.warns(UserWarning, match='skipped {} bytes'.format(len(xtf_bytes) - offsets[-1])):
+        resynced = XTFPacketStart.scan_offsets(_corrupt(xtf_bytes, offsets[-1]), XTFFileHeader._SIZE, resync=True)
+    np.testing.assert_array_equal(resynced, offsets[:-1])
+
+
+def _check_scan_packets(xtf_bytes: bytes):
+    offsets = XTFPacketStart.scan_offsets(xtf_bytes, XTFFileHeader._SIZE)
+    scan_offsets, header_types, sizes = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    assert scan_offsets.dtype == np.int64 and header_types.dtype == np.uint8 and sizes.dtype == np.uint32
+    np.testing.assert_array_equal(scan_offsets, offsets)
+    np.testing.assert_array_equal(header_types, [xtf_bytes[x + 2] for x in offsets])
+    np.testing.assert_array_equal(sizes, np.diff(np.append(offsets, len(xtf_bytes))))
+
+    with pytest.raises(RuntimeError, match='offset {} does not start'.format(offsets[3])):
+        XTFPacketStart.scan_packets(_corrupt(xtf_bytes, offsets[3]), XTFFileHeader._SIZE)
+
+    with pytest.raises(RuntimeError, match='offset {} has NumBytesThisRecord = 0'.format(offsets[5])):
+        XTFPacketStart.scan_packets(_zero_n_bytes(xtf_bytes, offsets[5]), XTFFileHeader._SIZE)
+
+
+def test_scan_packets(xtf_bytes):
+    _check_scan_packets(xtf_bytes)
+
+
+def test_scan_packets_pure_python(xtf_bytes, pure_python):
+    _check_scan_packets(xtf_bytes)
+
+
+def test_scan_packets_numba(xtf_bytes, numba_only):
+    _check_scan_packets(xtf_bytes)
+    assert xtf_ctypes._JIT_FUNCTIONS['scan_packets'] is not None
+
+
+def test_scan_packets_cython(xtf_bytes):
+    fastparse = pytest.importorskip('pyxtf._fastparse')
+    assert xtf_ctypes._scan_packets_compiled is fastparse.scan_packets
+    _check_scan_packets(xtf_bytes)
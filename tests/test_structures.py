@@ -0,0 +1,137 @@
+import copy
+import ctypes
+import pickle
+
+import numpy as np
+import pytest
+
+import pyxtf
+from pyxtf import *
+
+
+def _pickle_round_trip(obj):
+    return pickle.loads(pickle.dumps(obj))
+
+
+round_trips = pytest.mark.parametrize('round_trip', [_pickle_round_trip, copy.copy, copy.deepcopy])
+
+
+def _read_pings(xtf_path, lazy_pings):
+    with pytest.warns(UserWarning):
+        _, packets = pyxtf.xtf_read(xtf_path, lazy_pings=lazy_pings)
+    return packets[XTFHeaderType.sonar] + packets[XTFHeaderType.bathy_xyza]
+
+
+@round_trips
+@pytest.mark.parametrize('lazy_pings', [False, True])
+def test_ping_round_trip(xtf_path, round_trip, lazy_pings):
+    for ping in _read_pings(xtf_path, lazy_pings):
+        ping_copy = round_trip(ping)
+
+        assert type(ping_copy) is type(ping)
+        assert bytes(ping_copy) == bytes(ping)
+        assert ping_copy.ping_chan_headers.tobytes() == ping.ping_chan_headers.tobytes()
+        if ping.HeaderType == XTFHeaderType.sonar:
+            assert len(ping_copy.data) == len(ping.data) == 2
+            for data_copy, data in zip(ping_copy.data, ping.data):
+                np.testing.assert_array_equal(data_copy, data)
+        else:
+            assert ping_copy.data.tobytes() == ping.data.tobytes()
+
+
+def test_ping_deepcopy_is_independent(xtf_path):
+    ping = _read_pings(xtf_path, False)[0]
+    ping_copy = copy.deepcopy(ping)
+    ping_copy.PingNumber += 1
+    ping_copy.data = []
+
+    assert ping_copy.PingNumber == ping.PingNumber + 1
+    assert len(ping.data) == 2
+
+
+_STRUCTURES = sorted(
+    set(XTFPacketClasses.values()) |
+    {XTFFileHeader, XTFChanInfo, XTFPingChanHeader, XTFBeamXYZA, XTFUnknownPacket, SNP0, SNP1},
+    key=lambda cls: cls.__name__)
+
+
+@round_trips
+@pytest.mark.parametrize('xtf_struct', _STRUCTURES, ids=lambda cls: cls.__name__)
+def test_structure_round_trip(xtf_struct, round_trip):
+    struct_bytes = bytes(i % 251 for i in range(xtf_struct._SIZE))
+    obj = xtf_struct.from_buffer_copy(struct_bytes)
+    obj_copy = round_trip(obj)
+
+    assert type(obj_copy) is xtf_struct
+    assert bytes(obj_copy) == struct_bytes
+
+
+@round_trips
+def test_file_header_round_trip(xtf_bytes, round_trip):
+    fh = XTFFileHeader.create_from_buffer(xtf_bytes)
+    fh_copy = round_trip(fh)
+
+    assert bytes(fh_copy) == bytes(fh)
+    assert [bytes(x) for x in fh_copy.sonar_info] == [bytes(x) for x in fh.sonar_info]
+    assert [bytes(x) for x in fh_copy.bathy_info] == [bytes(x) for x in fh.bathy_info]
+    assert fh_copy._sonar_dtype == fh._sonar_dtype
+    assert fh_copy.channel_count() == 3
+
+
+def test_unknown_attribute():
+    # The slotted structures only accept their fields, misspelled names are not silently added to the instance
+    with pytest.raises(AttributeError):
+        XTFPingChanHeader().SlandRange = 10.0
+    with pytest.raises(AttributeError):
+        XTFHeaderGyro().Heading = 1.0
+
+    fh = XTFFileHeader()
+    fh.extra = 1
+    assert fh.extra == 1
+
+
+def test_asarray():
+    p = XTFAttitudeData()
+    reserved = p.asarray('Reserved2')
+    assert reserved.dtype == np.uint32 and reserved.shape == (2,)
+
+    # The array is a view of the structure
+    reserved[1] = 7
+    assert p.Reserved2[1] == 7
+    p.Reserved2[0] = 3
+    assert reserved[0] == 3
+
+    # Nested structures use the numpy dtype of the element class
+    fh = XTFFileHeader()
+    fh.ChanInfo[2].BytesPerSample = 2
+    chan_info = fh.asarray('ChanInfo')
+    assert chan_info.dtype == XTFChanInfo._np_dtype and chan_info.shape == (6,)
+    np.testing.assert_array_equal(chan_info['BytesPerSample'], [0, 0, 2, 0, 0, 0])
+    chan_info['TypeOfChannel'][1] = 5
+    assert fh.ChanInfo[1].TypeOfChannel == 5
+
+
+@pytest.mark.parametrize('field_name', ['Year', 'NotesText'])
+def test_asarray_not_array(field_name):
+    with pytest.raises(RuntimeError, match='is not an array'):
+        XTFNotesHeader().asarray(field_name)
+
+
+def test_unpack_tuple(xtf_bytes):
+    offsets, header_types, _ = XTFPacketStart.scan_packets(xtf_bytes, XTFFileHeader._SIZE)
+    for offset in offsets[header_types == XTFHeaderType.navigation.value]:
+        nav = XTFHeaderNavigation.create_from_buffer(xtf_bytes[offset:])
+        values = XTFHeaderNavigation.unpack_tuple(xtf_bytes, offset)
+
+        assert len(values) == len(XTFHeaderNavigation._all_fields)
+        for field_name, index in XTFHeaderNavigation._FIELD_INDEX.items():
+            field_value = getattr(nav, field_name)
+            if isinstance(field_value, ctypes.Array):
+                field_value = bytes(field_value)
+            assert values[index] == field_value, field_name
+
+    # Array and nested structure fields are returned as bytes
+    fh = XTFFileHeader.create_from_buffer(xtf_bytes)
+    values = XTFFileHeader.unpack_tuple(memoryview(xtf_bytes))
+    assert values[XTFFileHeader._FIELD_INDEX['ChanInfo']] == bytes(fh.ChanInfo)
+    assert values[XTFFileHeader._FIELD_INDEX['NumberOfSonarChannels']] == fh.NumberOfSonarChannels
@@ -0,0 +1,71 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import pyxtf
+from pyxtf import *
+
+
+@pytest.mark.parametrize('year, month, day', [
+    (2020, 1, 1), (2020, 2, 29), (2019, 2, 28), (2000, 2, 29), (2000, 12, 31), (1999, 3, 1), (9999, 12, 31),
+    (2020, 2, 0), (2019, 2, 29), (1900, 2, 29), (2020, 4, 31), (2020, 1, 32), (2020, 0, 1), (2020, 13, 1),
+    (0, 1, 1), (10000, 1, 1)
+])
+def test_get_time_date(year, month, day):
+    p = XTFHeaderNavigation()
+    p.Year, p.Month, p.Day, p.Hour, p.Minute, p.Second, p.Microsecond = year, month, day, 13, 14, 15, 16
+
+    # Valid dates gives the same time as datetime.date, and invalid dates raises ValueError like date does
+    try:
+        expected = np.datetime64(date(year, month, day)) + np.timedelta64(47655000016, 'us')
+    except ValueError:
+        with pytest.raises(ValueError):
+            p.get_time()
+    else:
+        assert p.get_time() == expected
+
+
+def _read_packets(xtf_path):
+    with pytest.warns(UserWarning):
+        _, packets = pyxtf.xtf_read(xtf_path)
+    return packets
+
+
+def _attitude_packets():
+    packets = []
+    for i in range(4):
+        a = XTFAttitudeData()
+        a.Year, a.Month, a.Day, a.Hour, a.Millisecond = 2020, 2, 29, i, 10 * i
+        # SourceEpoch (with EpochMicroseconds) is used instead of the date when set
+        a.SourceEpoch = 1600000000 + i if i % 2 else 0
+        a.EpochMicroseconds = 1000 * i
+        packets.append(a)
+    return packets
+
+
+@pytest.mark.parametrize('header_type', [
+    XTFHeaderType.sonar, XTFHeaderType.gyro, XTFHeaderType.navigation, XTFHeaderType.pos_raw_navigation,
+    XTFHeaderType.attitude
+])
+def test_get_times_bulk(xtf_path, header_type):
+    packets = _read_packets(xtf_path)[header_type]
+    if header_type == XTFHeaderType.attitude:
+        packets += _attitude_packets()
+
+    times = XTFPacket.get_times_bulk(packets)
+    assert times.dtype == np.dtype('datetime64[us]')
+    np.testing.assert_array_equal(times, [np.datetime64(p.get_time(), 'us') for p in packets])
+
+
+def test_get_times_bulk_empty():
+    times = XTFPacket.get_times_bulk([])
+    assert times.dtype == np.dtype('datetime64[us]') and times.shape == (0,)
+
+
+def test_get_times_from_records():
+    packets = _attitude_packets()
+    records = XTFAttitudeData.from_buffer_bulk(b''.join(bytes(p) for p in packets))
+
+    np.testing.assert_array_equal(XTFAttitudeData.get_times_from_records(records),
+                                  [np.datetime64(p.get_time(), 'us') for p in packets])